@@ -5,58 +5,19 @@ import re # import library for regular expression
 import random # library for random number generation
 from pathlib import Path
 
+from recipes_preprocessing import load_recipes
+from recipes_features import to_sparse
+from compiled_tree import export_tree
+
+# train and predict on a sparse (CSR) ingredient matrix instead of the dense frame;
+# see benchmark_sparse_features.py for the memory/time comparison
+USE_SPARSE_FEATURES = True
+
 path_to_recipes = Path(__file__).parent / "recipes.csv"
-recipes: pd.DataFrame = pd.read_csv(path_to_recipes)
-
-# fix name of the column displaying the cuisine
-column_names = recipes.columns.values
-column_names[0] = "cuisine"
-recipes.columns = column_names
-
-# convert cuisine names to lower case
-recipes["cuisine"] = recipes["cuisine"].str.lower()
-
-# make the cuisine names consistent
-recipes.loc[recipes["cuisine"] == "austria", "cuisine"] = "austrian"
-recipes.loc[recipes["cuisine"] == "belgium", "cuisine"] = "belgian"
-recipes.loc[recipes["cuisine"] == "china", "cuisine"] = "chinese"
-recipes.loc[recipes["cuisine"] == "canada", "cuisine"] = "canadian"
-recipes.loc[recipes["cuisine"] == "netherlands", "cuisine"] = "dutch"
-recipes.loc[recipes["cuisine"] == "france", "cuisine"] = "french"
-recipes.loc[recipes["cuisine"] == "germany", "cuisine"] = "german"
-recipes.loc[recipes["cuisine"] == "india", "cuisine"] = "indian"
-recipes.loc[recipes["cuisine"] == "indonesia", "cuisine"] = "indonesian"
-recipes.loc[recipes["cuisine"] == "iran", "cuisine"] = "iranian"
-recipes.loc[recipes["cuisine"] == "italy", "cuisine"] = "italian"
-recipes.loc[recipes["cuisine"] == "japan", "cuisine"] = "japanese"
-recipes.loc[recipes["cuisine"] == "israel", "cuisine"] = "jewish"
-recipes.loc[recipes["cuisine"] == "korea", "cuisine"] = "korean"
-recipes.loc[recipes["cuisine"] == "lebanon", "cuisine"] = "lebanese"
-recipes.loc[recipes["cuisine"] == "malaysia", "cuisine"] = "malaysian"
-recipes.loc[recipes["cuisine"] == "mexico", "cuisine"] = "mexican"
-recipes.loc[recipes["cuisine"] == "pakistan", "cuisine"] = "pakistani"
-recipes.loc[recipes["cuisine"] == "philippines", "cuisine"] = "philippine"
-recipes.loc[recipes["cuisine"] == "scandinavia", "cuisine"] = "scandinavian"
-recipes.loc[recipes["cuisine"] == "spain", "cuisine"] = "spanish_portuguese"
-recipes.loc[recipes["cuisine"] == "portugal", "cuisine"] = "spanish_portuguese"
-recipes.loc[recipes["cuisine"] == "switzerland", "cuisine"] = "swiss"
-recipes.loc[recipes["cuisine"] == "thailand", "cuisine"] = "thai"
-recipes.loc[recipes["cuisine"] == "turkey", "cuisine"] = "turkish"
-recipes.loc[recipes["cuisine"] == "vietnam", "cuisine"] = "vietnamese"
-recipes.loc[recipes["cuisine"] == "uk-and-ireland", "cuisine"] = "uk-and-irish"
-recipes.loc[recipes["cuisine"] == "irish", "cuisine"] = "uk-and-irish"
-
-
-# remove data for cuisines with < 50 recipes:
-recipes_counts = recipes["cuisine"].value_counts()
-cuisines_indices = recipes_counts > 50
-
-cuisines_to_keep = list(np.array(recipes_counts.index.values)[np.array(cuisines_indices)])
-recipes = recipes.loc[recipes["cuisine"].isin(cuisines_to_keep)]
-
-# convert all Yes's to 1's and the No's to 0's
-recipes = recipes.replace(to_replace="Yes", value=1)
-recipes = recipes.replace(to_replace="No", value=0)
+
+# cleaned recipes: categorical cuisine + one 0/1 uint8 column per ingredient.
+# cleaning runs once; later runs load the cached Parquet file (keyed on the CSV hash)
+recipes: pd.DataFrame = load_recipes(path_to_recipes)
 
 from sklearn import tree
 from sklearn.metrics import accuracy_score, confusion_matrix
@@ -72,7 +33,7 @@ cuisines = asian_indian_recipes["cuisine"]
 ingredients = asian_indian_recipes.iloc[:,1:]
 
 bamboo_tree = tree.DecisionTreeClassifier(max_depth=3)
-bamboo_tree.fit(ingredients, cuisines)
+bamboo_tree.fit(to_sparse(ingredients) if USE_SPARSE_FEATURES else ingredients, cuisines)
 
 print("Decision tree model saved to bamboo_tree!")
 
@@ -100,7 +61,8 @@ sample_n = 30
 
 # take 30 recipes from each cuisine
 random.seed(1234) # set random seed
-bamboo_test = bamboo.groupby("cuisine", group_keys=False).apply(lambda x: x.sample(sample_n))
+# observed=True: cuisine is categorical, skip the cuisines filtered out above
+bamboo_test = bamboo.groupby("cuisine", observed=True).sample(sample_n)
 
 bamboo_test_ingredients = bamboo_test.iloc[:,1:] # ingredients
 bamboo_test_cuisines = bamboo_test["cuisine"] # corresponding cuisines or labels
@@ -117,7 +79,8 @@ bamboo_train_cuisines = bamboo_train["cuisine"] # corresponding cuisines or labe
 bamboo_train["cuisine"].value_counts()
 
 bamboo_train_tree = tree.DecisionTreeClassifier(max_depth=15)
-bamboo_train_tree.fit(bamboo_train_ingredients, bamboo_train_cuisines)
+bamboo_train_features = to_sparse(bamboo_train_ingredients) if USE_SPARSE_FEATURES else bamboo_train_ingredients
+bamboo_train_tree.fit(bamboo_train_features, bamboo_train_cuisines)
 
 print("Decision tree model saved to bamboo_train_tree!")
 
@@ -136,7 +99,13 @@ with open("bamboo_train_tree.dot") as bamboo_train_tree_image:
     bamboo_train_tree_graph = bamboo_train_tree_image.read()
 graphviz.Source(bamboo_train_tree_graph)
 
-bamboo_pred_cuisines = bamboo_train_tree.predict(bamboo_test_ingredients)
+# export the trained tree as flat arrays for fast, sklearn-free serving (see cuisine_api.py)
+export_tree(bamboo_train_tree,
+            feature_names=list(bamboo_train_ingredients.columns.values),
+            directory=Path(__file__).parent / "models" / "bamboo_train_tree")
+
+bamboo_test_features = to_sparse(bamboo_test_ingredients) if USE_SPARSE_FEATURES else bamboo_test_ingredients
+bamboo_pred_cuisines = bamboo_train_tree.predict(bamboo_test_features)
 
 test_cuisines = np.unique(bamboo_test_cuisines)
 bamboo_confusion_matrix = confusion_matrix(bamboo_test_cuisines, bamboo_pred_cuisines, labels = test_cuisines)
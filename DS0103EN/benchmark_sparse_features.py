@@ -0,0 +1,76 @@
+"""Dense vs sparse (CSR) vs bit-packed ingredient matrices for the cuisine tree.
+
+Reports memory, fit time and predict time for each representation, and
+checks that they predict the same cuisines. Uses recipes.csv when present,
+otherwise a synthetic corpus with the same shape and sparsity.
+
+    python benchmark_sparse_features.py [n_synthetic_recipes]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn import tree
+from sklearn.metrics import accuracy_score, confusion_matrix
+
+from recipes_features import PackedIngredients, matrix_nbytes, predict_in_blocks, to_sparse
+from recipes_preprocessing import DEFAULT_RECIPES_PATH, load_recipes
+
+
+def synthetic_recipes(n_recipes: int, n_ingredients: int = 380, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cuisines = np.array(["chinese", "indian", "japanese", "korean", "thai"])
+    labels = rng.integers(0, len(cuisines), n_recipes)
+    # each cuisine favours its own ingredients, ~3% density overall
+    favoured = rng.random((len(cuisines), n_ingredients)) < 0.1
+    probability = np.where(favoured[labels], 0.15, 0.015)
+    ingredients = (rng.random((n_recipes, n_ingredients)) < probability).astype(np.uint8)
+    frame = pd.DataFrame(ingredients, columns=[f"ingredient_{i}" for i in range(n_ingredients)])
+    frame.insert(0, "cuisine", pd.Categorical(cuisines[labels]))
+    return frame
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    if len(sys.argv) < 2 and DEFAULT_RECIPES_PATH.exists():
+        recipes = load_recipes()
+    else:
+        recipes = synthetic_recipes(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
+
+    cuisines = recipes["cuisine"].astype(str).to_numpy()
+    dense = recipes.iloc[:, 1:]
+    csr = to_sparse(dense)
+    packed = PackedIngredients.pack(csr)
+    print(f"{dense.shape[0]} recipes x {dense.shape[1]} ingredients, density {csr.nnz / np.prod(dense.shape):.3f}")
+
+    dense_model, dense_fit = timed(tree.DecisionTreeClassifier(max_depth=15, random_state=0).fit, dense, cuisines)
+    sparse_model, sparse_fit = timed(tree.DecisionTreeClassifier(max_depth=15, random_state=0).fit, csr, cuisines)
+
+    runs = [
+        ("dense", dense, dense_fit, lambda: dense_model.predict(dense)),
+        ("csr", csr, sparse_fit, lambda: sparse_model.predict(csr)),
+        ("packed", packed, sparse_fit, lambda: predict_in_blocks(sparse_model, packed)),
+    ]
+
+    print(f"{'matrix':>7} {'MB':>8} {'fit s':>7} {'predict s':>10} {'accuracy':>9}")
+    reference = None
+    for name, matrix, fit_seconds, predict in runs:
+        predictions, predict_seconds = timed(predict)
+        reference = predictions if reference is None else reference
+        print(f"{name:>7} {matrix_nbytes(matrix) / 1e6:>8.2f} {fit_seconds:>7.2f} "
+              f"{predict_seconds:>10.3f} {accuracy_score(cuisines, predictions):>9.3f}")
+
+    labels = np.unique(cuisines)
+    same = (confusion_matrix(cuisines, reference, labels=labels)
+            == confusion_matrix(cuisines, sparse_model.predict(csr), labels=labels)).all()
+    print(f"dense and sparse trees give the same confusion matrix: {same}")
+
+
+if __name__ == "__main__":
+    main()
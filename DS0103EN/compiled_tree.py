@@ -0,0 +1,122 @@
+"""Fitted decision trees as flat NumPy arrays, for fast batch prediction.
+
+export_tree writes a trained sklearn DecisionTreeClassifier as one array per
+node attribute (feature, threshold, children, leaf class) plus a small
+JSON file with the class and feature names. CompiledTree loads them
+memory-mapped and walks all rows down the tree at once, one level per step.
+
+Loading and predicting only needs NumPy: no sklearn import and no pickles.
+"""
+import json
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# sklearn marks leaves with children_left == -1
+LEAF = -1
+
+
+def export_tree(model, feature_names: Sequence[str], directory: Path) -> Path:
+    """Write a fitted DecisionTreeClassifier as flat arrays under directory"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    tree = model.tree_
+
+    np.save(directory / "feature.npy", tree.feature.astype(np.int32))
+    # float64 as in sklearn: rounding to float32 would move the split points
+    np.save(directory / "threshold.npy", tree.threshold.astype(np.float64))
+    # (n_nodes, 2): [left, right], so both branches come from one gather and
+    # the loaded array can be memory-mapped as is
+    np.save(directory / "children.npy",
+            np.stack([tree.children_left, tree.children_right], axis=1).astype(np.int32))
+    # value has shape (n_nodes, n_outputs, n_classes); single output here
+    np.save(directory / "leaf_class.npy", tree.value[:, 0, :].argmax(axis=1).astype(np.int32))
+
+    (directory / "model.json").write_text(json.dumps({
+        "classes": [str(c) for c in model.classes_],
+        "feature_names": [str(f) for f in feature_names],
+    }))
+    return directory
+
+
+def _as_sklearn_input(X: np.ndarray) -> np.ndarray:
+    """X as sklearn's tree compares it: float32 against float64 thresholds.
+
+    Small integer types (the 0/1 ingredient matrices) are exact in float32
+    already and are left as they are.
+    """
+    if X.dtype == np.float32 or X.dtype == bool or (X.dtype.kind in "iu" and X.dtype.itemsize <= 2):
+        return X
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+class CompiledTree:
+    def __init__(self, directory: Path, mmap: bool = True):
+        directory = Path(directory)
+        mmap_mode = "r" if mmap else None
+        self.feature = np.load(directory / "feature.npy", mmap_mode=mmap_mode)
+        self.threshold = np.load(directory / "threshold.npy", mmap_mode=mmap_mode)
+        self.children = np.load(directory / "children.npy", mmap_mode=mmap_mode)
+        self.leaf_class = np.load(directory / "leaf_class.npy", mmap_mode=mmap_mode)
+        # Column views into the mapped file, not copies
+        self.left = self.children[:, 0]
+        self.right = self.children[:, 1]
+
+        meta = json.loads((directory / "model.json").read_text())
+        self.classes = np.array(meta["classes"])
+        self.feature_names: List[str] = meta["feature_names"]
+        self.feature_index = {name.lower(): i for i, name in enumerate(self.feature_names)}
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def predict_index(self, X: np.ndarray, block_rows: int = 8192) -> np.ndarray:
+        """Class index for each row of a dense (n_rows, n_features) matrix"""
+        X = np.ascontiguousarray(X)
+        # The traversal indexes X as a flat array with a stride of n_features
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a matrix with {self.n_features} feature columns, got shape {X.shape}")
+        nodes = np.empty(len(X), dtype=np.int32)
+        # Blocks keep the per-level working set in cache
+        for start in range(0, len(X), block_rows):
+            nodes[start:start + block_rows] = self._leaves(_as_sklearn_input(X[start:start + block_rows]))
+        return self.leaf_class[nodes]
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        flat = X.reshape(-1)
+        node = np.zeros(len(X), dtype=np.int32)
+        active = np.arange(len(X)) if self.left[0] != LEAF else np.empty(0, dtype=np.intp)
+
+        # One tree level per iteration for all rows still at an internal node
+        while active.size:
+            current = node[active]
+            go_right = flat[active * self.n_features + self.feature[current]] > self.threshold[current]
+            node[active] = self.children[current, go_right.astype(np.intp)]
+            active = active[self.left[node[active]] != LEAF]
+
+        return node
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes[self.predict_index(X)]
+
+    def encode(self, recipes: Iterable[Iterable[str]]) -> Tuple[np.ndarray, List[List[str]]]:
+        """0/1 matrix for lists of ingredient names, plus the names the model doesn't know"""
+        recipes = [list(r) for r in recipes]
+        X = np.zeros((len(recipes), self.n_features), dtype=np.uint8)
+        unknown = []
+        for row, ingredients in enumerate(recipes):
+            missing = []
+            for ingredient in ingredients:
+                column = self.feature_index.get(ingredient.strip().lower())
+                if column is None:
+                    missing.append(ingredient)
+                else:
+                    X[row, column] = 1
+            unknown.append(missing)
+        return X, unknown
+
+    def predict_ingredients(self, recipes: Iterable[Iterable[str]]) -> Tuple[np.ndarray, List[List[str]]]:
+        X, unknown = self.encode(recipes)
+        return self.predict(X), unknown
@@ -0,0 +1,56 @@
+"""Cuisine prediction service for the exported bamboo tree.
+
+    uvicorn cuisine_api:app --port 8001
+
+The model directory (written by compiled_tree.export_tree, see the exercise
+script) defaults to models/bamboo_train_tree and can be changed with the
+CUISINE_MODEL_DIR environment variable. It is memory-mapped once at startup.
+"""
+import os
+from pathlib import Path
+from typing import List
+
+from fastapi import FastAPI
+from pydantic import BaseModel, Field
+
+from compiled_tree import CompiledTree
+
+MODEL_DIR = Path(os.getenv("CUISINE_MODEL_DIR", Path(__file__).parent / "models" / "bamboo_train_tree"))
+
+model = CompiledTree(MODEL_DIR)
+
+app = FastAPI(title="Cuisine Classifier")
+
+
+class CuisineRequest(BaseModel):
+    recipes: List[List[str]] = Field(..., examples=[[["rice", "soy_sauce", "ginger"], ["cumin", "turmeric"]]])
+
+
+class CuisinePrediction(BaseModel):
+    cuisine: str
+    unknown_ingredients: List[str]
+
+
+class CuisineResponse(BaseModel):
+    predictions: List[CuisinePrediction]
+
+
+@app.post("/predict", response_model=CuisineResponse)
+def predict_cuisine(request: CuisineRequest) -> CuisineResponse:
+    """Predict the cuisine of each recipe from its list of ingredients"""
+    cuisines, unknown = model.predict_ingredients(request.recipes)
+    return CuisineResponse(predictions=[
+        CuisinePrediction(cuisine=cuisine, unknown_ingredients=missing)
+        for cuisine, missing in zip(cuisines.tolist(), unknown)
+    ])
+
+
+@app.get("/model")
+def model_info():
+    """Classes and ingredients the loaded model knows about"""
+    return {
+        "model_dir": str(MODEL_DIR),
+        "classes": model.classes.tolist(),
+        "n_ingredients": model.n_features,
+        "n_nodes": int(len(model.feature)),
+    }
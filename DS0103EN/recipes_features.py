@@ -0,0 +1,162 @@
+"""Compact ingredient matrices for the cuisine decision trees.
+
+Each recipe uses a handful of the several hundred ingredients, so the 0/1
+ingredient matrix is mostly zeros. Two compact forms are provided:
+
+- CSR sparse matrix: what DecisionTreeClassifier.fit/predict accept directly;
+  memory grows with the number of ingredients used, not recipes x ingredients
+- bit-packed rows (8 ingredients per byte): the smallest form for storing a
+  corpus, unpacked block by block when predicting
+
+read_recipes_sparse builds the CSR matrix straight from recipes.csv in
+chunks, so the dense Yes/No frame never has to fit in memory.
+load_recipes_sparse caches its result as an .npz next to the Parquet cache;
+tree_sweep.py trains from it.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from recipes_preprocessing import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_RECIPES_PATH,
+    MIN_RECIPES_PER_CUISINE,
+    PREPROCESSING_VERSION,
+    file_hash,
+    normalize_cuisines,
+)
+
+
+def to_sparse(ingredients: pd.DataFrame) -> sparse.csr_matrix:
+    """CSR copy of a 0/1 ingredient frame"""
+    return sparse.csr_matrix(ingredients.to_numpy(dtype=np.uint8))
+
+
+def read_recipes_sparse(path: Path = DEFAULT_RECIPES_PATH, chunksize: int = 50_000,
+                        min_recipes: int = MIN_RECIPES_PER_CUISINE
+                        ) -> Tuple[sparse.csr_matrix, pd.Series, List[str]]:
+    """Stream recipes.csv into (CSR ingredient matrix, cuisine labels, ingredient names).
+
+    Applies the same cleaning as recipes_preprocessing.clean_recipes, but only
+    one chunk is ever held as a dense frame.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    cuisine_column, ingredient_names = header[0], list(header[1:])
+
+    blocks, cuisines = [], []
+    chunks = pd.read_csv(
+        path,
+        chunksize=chunksize,
+        # Ingredients as Yes/No strings: one dtype per column in every chunk,
+        # whether or not that chunk has missing values
+        dtype={cuisine_column: "category", **{name: "string" for name in ingredient_names}},
+    )
+    for chunk in chunks:
+        cuisines.append(chunk[cuisine_column].astype(str))
+        dense = (chunk[ingredient_names] == "Yes").fillna(False).to_numpy(dtype=np.uint8)
+        blocks.append(sparse.csr_matrix(dense))
+
+    matrix = sparse.vstack(blocks, format="csr")
+    cuisine = normalize_cuisines(pd.concat(cuisines, ignore_index=True))
+
+    # remove data for cuisines with too few recipes
+    counts = cuisine.value_counts()
+    keep = cuisine.isin(counts.index[counts > min_recipes]).to_numpy()
+    cuisine = cuisine[keep].cat.remove_unused_categories().reset_index(drop=True)
+    return matrix[keep], cuisine, ingredient_names
+
+
+def load_recipes_sparse(path: Path = DEFAULT_RECIPES_PATH, cache_dir: Path = DEFAULT_CACHE_DIR,
+                        refresh: bool = False) -> Tuple[sparse.csr_matrix, pd.Series, List[str]]:
+    """read_recipes_sparse, from an .npz cache when the source file hasn't changed"""
+    path = Path(path)
+    cache_path = Path(cache_dir) / f"recipes-sparse-v{PREPROCESSING_VERSION}-{file_hash(path)[:16]}.npz"
+
+    if cache_path.exists() and not refresh:
+        with np.load(cache_path) as cached:
+            matrix = sparse.csr_matrix(
+                (cached["data"], cached["indices"], cached["indptr"]), shape=tuple(cached["shape"])
+            )
+            cuisine = pd.Series(
+                pd.Categorical.from_codes(cached["codes"], categories=cached["categories"]),
+                name="cuisine",
+            )
+            return matrix, cuisine, cached["ingredients"].tolist()
+
+    matrix, cuisine, ingredient_names = read_recipes_sparse(path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # Written under a temporary name and renamed, so concurrent readers never see half a file
+    tmp_path = cache_path.with_name(f".{cache_path.stem}.{os.getpid()}.npz")
+    np.savez(
+        tmp_path,
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+        shape=np.array(matrix.shape),
+        codes=cuisine.cat.codes.to_numpy(),
+        categories=np.array(cuisine.cat.categories, dtype=str),
+        ingredients=np.array(ingredient_names, dtype=str),
+    )
+    os.replace(tmp_path, cache_path)
+    return matrix, cuisine, ingredient_names
+
+
+@dataclass
+class PackedIngredients:
+    """0/1 ingredient rows packed 8 per byte"""
+    bits: np.ndarray
+    n_features: int
+
+    @classmethod
+    def pack(cls, matrix) -> "PackedIngredients":
+        n_features = matrix.shape[1]
+        if sparse.issparse(matrix):
+            # Pack block by block so the dense form never exists in full
+            bits = np.vstack([
+                np.packbits(block.toarray().astype(bool), axis=1)
+                for block in _row_blocks(matrix)
+            ])
+        else:
+            bits = np.packbits(np.asarray(matrix, dtype=bool), axis=1)
+        return cls(bits=bits, n_features=n_features)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def unpack(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        return np.unpackbits(self.bits[start:stop], axis=1, count=self.n_features)
+
+    def blocks(self, block_rows: int = 50_000) -> Iterator[np.ndarray]:
+        for start in range(0, len(self.bits), block_rows):
+            yield self.unpack(start, start + block_rows)
+
+
+def _row_blocks(matrix: sparse.csr_matrix, block_rows: int = 50_000) -> Iterator[sparse.csr_matrix]:
+    for start in range(0, matrix.shape[0], block_rows):
+        yield matrix[start:start + block_rows]
+
+
+def predict_in_blocks(model, features, block_rows: int = 50_000) -> np.ndarray:
+    """model.predict over a CSR matrix or packed rows, one block at a time"""
+    if isinstance(features, PackedIngredients):
+        blocks = features.blocks(block_rows)
+    else:
+        blocks = _row_blocks(features, block_rows)
+    return np.concatenate([model.predict(block) for block in blocks])
+
+
+def matrix_nbytes(matrix) -> int:
+    """Memory held by a dense array/frame, CSR matrix or packed rows"""
+    if isinstance(matrix, PackedIngredients):
+        return matrix.nbytes
+    if sparse.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    if isinstance(matrix, pd.DataFrame):
+        return int(matrix.memory_usage(index=False).sum())
+    return np.asarray(matrix).nbytes
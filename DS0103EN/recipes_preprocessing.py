@@ -0,0 +1,153 @@
+"""Load and clean the recipes dataset, with a cached columnar copy.
+
+The raw recipes.csv has one cuisine column followed by one Yes/No column per
+ingredient. Cleaning it produces:
+
+- "cuisine": categorical, lower-case, with country names mapped to cuisines
+  and cuisines with too few recipes dropped
+- one uint8 column (0/1) per ingredient
+
+The cleaned frame is written to a Parquet file named after the hash of the
+source CSV, so later runs skip parsing and cleaning entirely.
+"""
+import hashlib
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RECIPES_PATH = Path(__file__).parent / "recipes.csv"
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache"
+
+# Bump when the cleaning below changes, so old cached artifacts are not reused
+PREPROCESSING_VERSION = 1
+
+MIN_RECIPES_PER_CUISINE = 50
+
+# make the cuisine names consistent
+CUISINE_NAMES = {
+    "austria": "austrian",
+    "belgium": "belgian",
+    "china": "chinese",
+    "canada": "canadian",
+    "netherlands": "dutch",
+    "france": "french",
+    "germany": "german",
+    "india": "indian",
+    "indonesia": "indonesian",
+    "iran": "iranian",
+    "italy": "italian",
+    "japan": "japanese",
+    "israel": "jewish",
+    "korea": "korean",
+    "lebanon": "lebanese",
+    "malaysia": "malaysian",
+    "mexico": "mexican",
+    "pakistan": "pakistani",
+    "philippines": "philippine",
+    "scandinavia": "scandinavian",
+    "spain": "spanish_portuguese",
+    "portugal": "spanish_portuguese",
+    "switzerland": "swiss",
+    "thailand": "thai",
+    "turkey": "turkish",
+    "vietnam": "vietnamese",
+    "uk-and-ireland": "uk-and-irish",
+    "irish": "uk-and-irish",
+}
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_cuisines(cuisine: pd.Series) -> pd.Series:
+    """Lower-case and map cuisine names in one pass over the distinct values.
+
+    The column is categorical, so the mapping is applied to the ~50 category
+    names and the per-row codes are remapped with a single array lookup.
+    """
+    cuisine = cuisine.astype("category")
+    mapped = [CUISINE_NAMES.get(name.lower(), name.lower()) for name in cuisine.cat.categories]
+    categories, remap = np.unique(mapped, return_inverse=True)
+
+    codes = cuisine.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, remap[codes], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=categories),
+        index=cuisine.index,
+        name="cuisine",
+    )
+
+
+def read_recipes_csv(path: Path = DEFAULT_RECIPES_PATH) -> pd.DataFrame:
+    """Parse recipes.csv with the Yes/No ingredient columns read straight into booleans"""
+    header = pd.read_csv(path, nrows=0).columns
+    return pd.read_csv(
+        path,
+        dtype={header[0]: "category"},
+        true_values=["Yes"],
+        false_values=["No"],
+        low_memory=False,
+    )
+
+
+def clean_recipes(raw: pd.DataFrame, min_recipes: int = MIN_RECIPES_PER_CUISINE) -> pd.DataFrame:
+    cuisine = normalize_cuisines(raw.iloc[:, 0])
+
+    # remove data for cuisines with too few recipes
+    counts = cuisine.value_counts()
+    keep = cuisine.isin(counts.index[counts > min_recipes]).to_numpy()
+    cuisine = cuisine[keep].cat.remove_unused_categories()
+
+    ingredients = raw.iloc[keep, 1:]
+    # Columns with missing values are not parsed as bool; compare those explicitly
+    not_bool = [c for c in ingredients.columns if ingredients[c].dtype != bool]
+    if not_bool:
+        ingredients = ingredients.copy()
+        ingredients[not_bool] = ingredients[not_bool].isin([True, "Yes"])
+
+    # Renumber the rows so a fresh result matches one read back from the cache
+    # (which doesn't store the index) label for label
+    return pd.concat([cuisine, ingredients.astype(np.uint8)], axis=1).reset_index(drop=True)
+
+
+def _cache_path(path: Path, cache_dir: Path) -> Path:
+    return cache_dir / f"recipes-v{PREPROCESSING_VERSION}-{file_hash(path)[:16]}.parquet"
+
+
+def _write_cache(recipes: pd.DataFrame, cache_path: Path) -> Path:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        recipes.to_parquet(cache_path, index=False)
+        return cache_path
+    except ImportError:
+        # No parquet engine installed; a pickle still skips parsing and cleaning
+        cache_path = cache_path.with_suffix(".pkl")
+        with open(cache_path, "wb") as f:
+            pickle.dump(recipes, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return cache_path
+
+
+def load_recipes(path: Path = DEFAULT_RECIPES_PATH, cache_dir: Path = DEFAULT_CACHE_DIR,
+                 refresh: bool = False) -> pd.DataFrame:
+    """Cleaned recipes, from the cache when the source file hasn't changed"""
+    path = Path(path)
+    cache_path = _cache_path(path, Path(cache_dir))
+    pickle_path = cache_path.with_suffix(".pkl")
+
+    if not refresh:
+        if cache_path.exists():
+            return pd.read_parquet(cache_path)
+        if pickle_path.exists():
+            return pd.read_pickle(pickle_path)
+
+    recipes = clean_recipes(read_recipes_csv(path))
+    _write_cache(recipes, cache_path)
+    return recipes
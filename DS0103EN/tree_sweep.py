@@ -0,0 +1,156 @@
+"""Hyperparameter sweep for the bamboo (Asian and Indian cuisines) decision tree.
+
+Evaluates every combination of max_depth, min_samples_leaf and criterion with
+stratified k-fold cross-validation. Each (config, fold) pair is a separate
+task on a process pool. The recipes are streamed into a CSR matrix once and
+cached (see recipes_features.load_recipes_sparse), so the dense frame is never
+built; each worker loads that matrix once and trains on it.
+
+    python tree_sweep.py --max-depth 3 5 10 15 none --folds 5 --workers 8
+
+Writes one row per config with mean/std accuracy and timing to
+sweep_results.csv (or --output).
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sklearn import tree
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+
+from recipes_features import load_recipes_sparse
+from recipes_preprocessing import DEFAULT_CACHE_DIR, DEFAULT_RECIPES_PATH
+
+BAMBOO_CUISINES = ["korean", "japanese", "chinese", "thai", "indian"]
+
+# Set in each worker by _init_worker
+_features = None
+_labels = None
+_folds = None
+
+
+def load_bamboo(recipes_path: Path, cache_dir: Path, cuisines: list):
+    matrix, cuisine, _ = load_recipes_sparse(recipes_path, cache_dir)
+    keep = cuisine.isin(cuisines).to_numpy()
+    return matrix[keep], cuisine[keep].astype(str).to_numpy()
+
+
+def _init_worker(recipes_path: Path, cache_dir: Path, cuisines: list, n_folds: int, seed: int) -> None:
+    global _features, _labels, _folds
+    _features, _labels = load_bamboo(recipes_path, cache_dir, cuisines)
+    # Same seed in every worker, so all of them see the same folds
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    _folds = list(splitter.split(np.zeros(len(_labels)), _labels))
+
+
+def _evaluate(params: dict, fold: int, seed: int) -> dict:
+    train_index, test_index = _folds[fold]
+    model = tree.DecisionTreeClassifier(random_state=seed, **params)
+
+    start = time.perf_counter()
+    model.fit(_features[train_index], _labels[train_index])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = model.predict(_features[test_index])
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        **params,
+        "fold": fold,
+        "accuracy": accuracy_score(_labels[test_index], predictions),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "tree_depth": model.get_depth(),
+        "n_leaves": model.get_n_leaves(),
+    }
+
+
+def parameter_grid(max_depths, min_samples_leafs, criteria) -> list:
+    return [
+        {"max_depth": depth, "min_samples_leaf": leaf, "criterion": criterion}
+        for depth, leaf, criterion in itertools.product(max_depths, min_samples_leafs, criteria)
+    ]
+
+
+def run_sweep(grid: list, n_folds: int = 5, workers: Optional[int] = None, seed: int = 1234,
+              recipes_path: Path = DEFAULT_RECIPES_PATH, cache_dir: Path = DEFAULT_CACHE_DIR,
+              cuisines: list = BAMBOO_CUISINES) -> pd.DataFrame:
+    """Cross-validate every config in the grid; one row per config, best first"""
+    # Build the sparse cache once up front so workers only read it
+    load_recipes_sparse(recipes_path, cache_dir)
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(recipes_path, cache_dir, cuisines, n_folds, seed),
+    ) as pool:
+        futures = [
+            pool.submit(_evaluate, params, fold, seed)
+            for params in grid
+            for fold in range(n_folds)
+        ]
+        for future in as_completed(futures):
+            row = future.result()
+            # "none" rather than NaN, which would turn the depths into floats
+            row["max_depth"] = "none" if row["max_depth"] is None else row["max_depth"]
+            results.append(row)
+
+    folds = pd.DataFrame(results)
+    keys = ["max_depth", "min_samples_leaf", "criterion"]
+    summary = (
+        folds.groupby(keys, sort=False)
+        .agg(
+            mean_accuracy=("accuracy", "mean"),
+            std_accuracy=("accuracy", "std"),
+            mean_fit_seconds=("fit_seconds", "mean"),
+            total_fit_seconds=("fit_seconds", "sum"),
+            mean_predict_seconds=("predict_seconds", "mean"),
+            mean_tree_depth=("tree_depth", "mean"),
+            mean_n_leaves=("n_leaves", "mean"),
+        )
+        .reset_index()
+        .sort_values(["mean_accuracy", "mean_fit_seconds"], ascending=[False, True])
+    )
+    return summary
+
+
+def _depth(value: str):
+    return None if value.lower() == "none" else int(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=Path, default=DEFAULT_RECIPES_PATH)
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--max-depth", type=_depth, nargs="+", default=[3, 5, 8, 10, 15, 20, None])
+    parser.add_argument("--min-samples-leaf", type=int, nargs="+", default=[1, 2, 5, 10])
+    parser.add_argument("--criterion", nargs="+", default=["gini", "entropy"])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", type=Path, default=Path("sweep_results.csv"))
+    args = parser.parse_args()
+
+    grid = parameter_grid(args.max_depth, args.min_samples_leaf, args.criterion)
+    print(f"Evaluating {len(grid)} configs x {args.folds} folds on {args.workers} workers")
+
+    start = time.perf_counter()
+    summary = run_sweep(grid, args.folds, args.workers, args.seed, args.recipes, args.cache_dir)
+    print(f"Sweep finished in {time.perf_counter() - start:.1f}s")
+
+    summary.to_csv(args.output, index=False)
+    print(summary.head(10).to_string(index=False))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,27 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.core.admission import PRIORITY_IN_PROGRESS, PRIORITY_NEW, chat_admission
+from app.core.responses import ModelJSONResponse
 from app.models.chat import ChatRequest, ChatResponse
 from app.services.chat_service import chat_service
 import uuid
 
 router = APIRouter()
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat_message(request: ChatRequest) -> ChatResponse:
+@router.post("/chat", response_model=ChatResponse, response_class=ModelJSONResponse)
+async def chat_message(request: ChatRequest) -> ModelJSONResponse:
     """Process a chat message and return response with context"""
-    try:
-        response = chat_service.process_message(request)
-        return response
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing chat message: {str(e)}")
+    # Conversations already under way are served before brand new sessions
+    in_progress = chat_service.get_conversation_history(request.session_id) is not None
+    priority = PRIORITY_IN_PROGRESS if in_progress else PRIORITY_NEW
+    
+    async with chat_admission.slot(session_id=request.session_id, priority=priority):
+        try:
+            # Searches block on ES and embeddings; keep them off the event loop
+            response = await run_in_threadpool(chat_service.process_message, request)
+            return ModelJSONResponse(response)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing chat message: {str(e)}")
 
 @router.post("/chat/new-session")
 async def create_chat_session():
@@ -25,7 +34,7 @@ async def get_chat_history(session_id: str):
     history = chat_service.get_conversation_history(session_id)
     if not history:
         raise HTTPException(status_code=404, detail="Session not found")
-    return history
+    return ModelJSONResponse(history)
 
 @router.delete("/chat/{session_id}")
 async def clear_chat_session(session_id: str):
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from app.core.health import all_workers, worker_health
+
+router = APIRouter()
+
+@router.get("/health")
+async def health():
+    """Health of the worker that served this request"""
+    return {"status": "ok", **worker_health.snapshot()}
+
+@router.get("/health/workers")
+async def workers_health():
+    """Health of every worker in the pool, from their heartbeat files"""
+    workers = all_workers()
+    return {
+        "status": "ok" if workers and not any(w["stale"] for w in workers) else "degraded",
+        "workers": workers
+    }
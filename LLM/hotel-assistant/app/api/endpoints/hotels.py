@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Query
+from fastapi.concurrency import run_in_threadpool
+from app.core.admission import recommendations_admission
+from app.core.responses import ModelJSONResponse
 from app.services.rag_service import recommend_hotels
 from app.models.hotel import Hotel
 
 router = APIRouter()
 
-@router.get("/recommendations", response_model=list[Hotel])
+@router.get("/recommendations", response_model=list[Hotel], response_class=ModelJSONResponse)
 async def hotel_recommendations(
         query: str = Query(..., example="Family-friendly hotel with pool"),
-    ) -> list[Hotel]:
-    return recommend_hotels(query)
+    ) -> ModelJSONResponse:
+    async with recommendations_admission.slot():
+        hotels = await run_in_threadpool(recommend_hotels, query)
+    return ModelJSONResponse(hotels, response_type=list[Hotel])
 
 @router.get("/debug/elasticsearch")
 async def debug_elasticsearch():
@@ -0,0 +1,141 @@
+"""Admission control for the slow endpoints.
+
+Each endpoint gets a fixed number of concurrent slots, a bounded wait queue
+and a deadline. Requests that can't be served in time are rejected right away
+with 429/503 and a Retry-After header instead of piling up behind slow
+Elasticsearch and embedding calls until clients time out.
+
+Limits are per worker process; all bookkeeping happens on the event loop,
+so no locking is needed.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+# Lower value = served first
+PRIORITY_IN_PROGRESS = 0
+PRIORITY_NEW = 1
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class AdmissionController:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int,
+                 max_wait_seconds: float, per_session_limit: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.per_session_limit = per_session_limit
+
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._session_active: Dict[str, int] = {}
+        # Moving average of how long a request holds its slot
+        self._service_seconds = 1.0
+
+    def _pending(self) -> List[Tuple[int, int, asyncio.Future]]:
+        return [w for w in self._waiters if not w[2].done()]
+
+    def _estimated_wait(self, priority: int) -> float:
+        ahead = sum(1 for p, _, _ in self._pending() if p <= priority)
+        return (ahead // self.max_concurrent + 1) * self._service_seconds
+
+    def _release(self) -> None:
+        # Hand the slot straight to the best waiter, if any
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def _evict_lowest_priority(self, priority: int) -> bool:
+        """Make room in a full queue by rejecting the newest waiter of a lower priority"""
+        victims = [w for w in self._pending() if w[0] > priority]
+        if not victims:
+            return False
+        victim = max(victims, key=lambda w: (w[0], w[1]))
+        victim[2].set_exception(_reject(
+            503, f"{self.name} is overloaded, please retry", self._service_seconds
+        ))
+        return True
+
+    async def _wait_for_slot(self, priority: int) -> None:
+        if self.active < self.max_concurrent and not self._pending():
+            self.active += 1
+            return
+
+        if len(self._pending()) >= self.max_queue and not self._evict_lowest_priority(priority):
+            raise _reject(429, f"Too many requests waiting for {self.name}", self._service_seconds)
+
+        estimated_wait = self._estimated_wait(priority)
+        if estimated_wait > self.max_wait_seconds:
+            raise _reject(503, f"{self.name} is overloaded, please retry", estimated_wait)
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            raise _reject(503, f"Timed out waiting for {self.name}", self._service_seconds)
+        except BaseException:
+            # Client went away right as the slot was handed over: pass it on
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._release()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, session_id: Optional[str] = None,
+                   priority: int = PRIORITY_NEW) -> AsyncIterator[None]:
+        """Hold one of the endpoint's slots for the duration of the block"""
+        if session_id and self._session_active.get(session_id, 0) >= self.per_session_limit:
+            raise _reject(429, "A request for this session is already in progress", self._service_seconds)
+
+        if session_id:
+            self._session_active[session_id] = self._session_active.get(session_id, 0) + 1
+        try:
+            await self._wait_for_slot(priority)
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                self._service_seconds = 0.8 * self._service_seconds + 0.2 * (time.monotonic() - started)
+                self._release()
+        finally:
+            if session_id:
+                self._session_active[session_id] -= 1
+                if not self._session_active[session_id]:
+                    del self._session_active[session_id]
+
+
+chat_admission = AdmissionController(
+    "chat",
+    max_concurrent=settings.ADMISSION_CHAT_MAX_CONCURRENT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    max_wait_seconds=settings.ADMISSION_MAX_WAIT_SECONDS,
+    per_session_limit=settings.ADMISSION_PER_SESSION_LIMIT,
+)
+
+recommendations_admission = AdmissionController(
+    "recommendations",
+    max_concurrent=settings.ADMISSION_RECOMMENDATIONS_MAX_CONCURRENT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    max_wait_seconds=settings.ADMISSION_MAX_WAIT_SECONDS,
+    per_session_limit=settings.ADMISSION_PER_SESSION_LIMIT,
+)
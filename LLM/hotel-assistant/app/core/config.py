@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -7,6 +8,61 @@ class Settings(BaseSettings):
     # ES_PASS: str
     OPENAI_API_KEY: str
 
+    # Vector storage: int8_hnsw keeps 1 byte per dimension in the ES HNSW graph
+    # (ES 8.12+); falls back to plain hnsw on clusters that don't support it
+    EMBEDDING_DIMS: int = 1536
+    ES_VECTOR_INDEX_TYPE: str = "int8_hnsw"
+
+    # Rerank stage: over-fetch candidates and rescore them locally against the user context
+    RERANK_ENABLED: bool = True
+    RERANK_OVERFETCH: int = 4
+    RERANK_BUDGET_MS: float = 25.0
+    RERANK_WEIGHT_SIMILARITY: float = 1.0
+    RERANK_WEIGHT_AMENITIES: float = 0.6
+    RERANK_WEIGHT_GEO: float = 0.3
+    RERANK_WEIGHT_TYPE: float = 0.4
+    RERANK_GEO_SCALE_KM: float = 10.0
+
+    # Seconds to wait for Elasticsearch before treating it as unavailable
+    ES_TIMEOUT_SECONDS: float = 2.0
+    # After a failed check or search, serve from the snapshot for this long before trying ES again
+    ES_CIRCUIT_OPEN_SECONDS: float = 10.0
+
+    # Local hotel snapshot served when Elasticsearch is down or reindexing (disabled when unset)
+    SNAPSHOT_DIR: Optional[str] = None
+    SNAPSHOT_REFRESH_SECONDS: float = 900.0
+    SNAPSHOT_VECTOR_FIELD: str = "vector"
+    SNAPSHOT_VECTOR_SEARCH: bool = False
+    # Query embedding for snapshot vector search; on timeout the search is lexical only
+    SNAPSHOT_EMBEDDING_TIMEOUT_SECONDS: float = 1.0
+
+    # Admission control (per worker): concurrent slots per endpoint, a bounded wait
+    # queue, and how long a request may wait before it is rejected with 503
+    ADMISSION_CHAT_MAX_CONCURRENT: int = 8
+    ADMISSION_RECOMMENDATIONS_MAX_CONCURRENT: int = 4
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_MAX_WAIT_SECONDS: float = 10.0
+    ADMISSION_PER_SESSION_LIMIT: int = 1
+
+    # Each worker writes a heartbeat file here so any worker can report on all of them
+    HEALTH_DIR: str = "/tmp/hotel-assistant-workers"
+    HEALTH_HEARTBEAT_SECONDS: float = 5.0
+
+    # Speculative search: prefetch hotels in the background while we are still
+    # asking clarifying questions, so the next turn can answer immediately
+    SPECULATIVE_SEARCH: bool = False
+    SPECULATIVE_MAX_CONCURRENCY: int = 2
+    SPECULATIVE_TOP_K: int = 10
+    # How long a turn waits on an in-flight prefetch before running its own search
+    SPECULATIVE_WAIT_SECONDS: float = 1.0
+    # Parked prefetches of sessions that never came back are dropped after this long,
+    # and the oldest are evicted beyond SPECULATIVE_MAX_PARKED
+    SPECULATIVE_TTL_SECONDS: float = 300.0
+    SPECULATIVE_MAX_PARKED: int = 1000
+
+    # Responses larger than this many bytes are compressed (brotli if installed, else gzip)
+    COMPRESSION_MIN_SIZE: int = 1000
+
     class Config:
         env_file = ".env"  # Loads variables from your .env file automatically
 
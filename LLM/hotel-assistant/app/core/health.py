@@ -0,0 +1,92 @@
+"""Per-worker health reporting.
+
+Every worker process periodically writes a small heartbeat file to
+settings.HEALTH_DIR, so a request landing on any worker can report the state
+of the whole pool. A worker that stops updating its heartbeat is stale.
+"""
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.preload import resources
+
+
+class WorkerHealth:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.requests_served = 0
+        self.in_flight = 0
+
+    def reset(self) -> None:
+        """Start fresh after fork; counters inherited from the master are meaningless"""
+        self.__init__()
+
+    @property
+    def heartbeat_path(self) -> Path:
+        return Path(settings.HEALTH_DIR) / f"{self.pid}.json"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pid": self.pid,
+            "started_at": self.started_at,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests_served": self.requests_served,
+            "in_flight": self.in_flight,
+            "preloaded_resources": sorted(resources),
+            "heartbeat_at": time.time(),
+        }
+
+    def write_heartbeat(self) -> None:
+        path = self.heartbeat_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp_path, path)
+
+    def remove_heartbeat(self) -> None:
+        self.heartbeat_path.unlink(missing_ok=True)
+
+    async def heartbeat_loop(self) -> None:
+        while True:
+            try:
+                self.write_heartbeat()
+            except OSError as e:
+                print(f"❌ Could not write worker heartbeat: {e}")
+            await asyncio.sleep(settings.HEALTH_HEARTBEAT_SECONDS)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return pid > 0
+
+
+def all_workers() -> List[Dict[str, Any]]:
+    """Heartbeats of every worker, flagged stale when they stopped updating"""
+    stale_after = settings.HEALTH_HEARTBEAT_SECONDS * 3
+    workers = []
+    for path in sorted(Path(settings.HEALTH_DIR).glob("*.json")):
+        try:
+            worker = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if not _process_alive(worker.get("pid", 0)):
+            # Worker died without cleaning up (e.g. OOM-killed)
+            path.unlink(missing_ok=True)
+            continue
+        worker["stale"] = time.time() - worker.get("heartbeat_at", 0) > stale_after
+        workers.append(worker)
+    return workers
+
+
+# Health of the current process
+worker_health = WorkerHealth()
@@ -0,0 +1,21 @@
+"""Local resources loaded once per process.
+
+In production mode gunicorn imports the app in the master process
+(preload_app), so everything loaded here is shared copy-on-write by all
+forked workers instead of being loaded again in each of them.
+"""
+from typing import Any, Dict
+from app.core.config import settings
+
+# Name -> loaded resource (indexes, snapshots, caches)
+resources: Dict[str, Any] = {}
+
+
+def preload_resources() -> None:
+    """Load the hotel snapshot configured in settings."""
+    if settings.SNAPSHOT_DIR and "hotel_snapshot" not in resources:
+        from app.services.snapshot_service import get_snapshot
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            resources["hotel_snapshot"] = snapshot
+            print(f"✅ Loaded hotel snapshot {snapshot.name} with {len(snapshot)} hotels")
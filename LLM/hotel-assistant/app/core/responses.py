@@ -0,0 +1,30 @@
+from functools import lru_cache
+from typing import Any
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+class ModelJSONResponse(Response):
+    """JSON response rendered straight from pydantic models by pydantic-core.
+
+    Returning a Response from an endpoint makes FastAPI skip its own
+    response_model validation and jsonable_encoder pass, so each model is
+    serialized exactly once, in Rust, without an intermediate dict.
+    """
+    media_type = "application/json"
+
+    def __init__(self, content: Any, response_type: Any = None, **kwargs: Any):
+        self.response_type = response_type
+        super().__init__(content=content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        if self.response_type is not None:
+            return _type_adapter(self.response_type).dump_json(content)
+        return _type_adapter(type(content)).dump_json(content)
@@ -1,9 +1,42 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from app.core.config import settings
+from app.core.health import worker_health
+from app.core.preload import preload_resources
 from app.api.endpoints.hotels import router as hotels_router
 from app.api.endpoints.chat import router as chat_router
+from app.api.endpoints.health import router as health_router
+from app.services.chat_service import chat_service
+from app.services.rag_service import ensure_vector_index
+from app.services.snapshot_service import start_snapshot_refresher
 
-app = FastAPI(title="Hotel Recommendation Assistant")
+# Load local indexes at import time: with gunicorn's preload_app this runs once
+# in the master, and the forked workers share the pages copy-on-write
+preload_resources()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in each worker after fork
+    worker_health.reset()
+    # Network I/O stays out of import so preloading can't hang on an unreachable cluster
+    await asyncio.to_thread(ensure_vector_index)
+    heartbeat_task = asyncio.create_task(worker_health.heartbeat_loop())
+    # Every worker runs a refresher; a file lock makes sure only one rebuilds at a time
+    snapshot_refresher = start_snapshot_refresher()
+    yield
+    # Graceful shutdown: stop background work and deregister this worker
+    heartbeat_task.cancel()
+    if snapshot_refresher:
+        snapshot_refresher.set()
+    chat_service.shutdown()
+    worker_health.remove_heartbeat()
+
+
+app = FastAPI(title="Hotel Recommendation Assistant", lifespan=lifespan)
 
 # Add CORS middleware for frontend
 app.add_middleware(
@@ -14,5 +47,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large payloads (hotel lists with descriptions and amenities).
+# Brotli is used when the optional brotli-asgi package is installed; it still
+# falls back to gzip for clients that don't accept "br".
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    worker_health.in_flight += 1
+    try:
+        return await call_next(request)
+    finally:
+        worker_health.in_flight -= 1
+        worker_health.requests_served += 1
+
+
 app.include_router(hotels_router, prefix="/api")
 app.include_router(chat_router, prefix="/api")
+app.include_router(health_router, prefix="/api")
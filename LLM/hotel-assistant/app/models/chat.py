@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List
 from enum import Enum
+from app.models.hotel import Hotel
 
 class MessageRole(str, Enum):
     USER = "user"
@@ -42,4 +43,4 @@ class ChatResponse(BaseModel):
     user_context: UserContext
     missing_info: List[str]
     ready_to_search: bool
-    suggested_hotels: Optional[List[Dict[str, Any]]] = None
\ No newline at end of file
+    suggested_hotels: Optional[List[Hotel]] = None
\ No newline at end of file
@@ -1,7 +1,11 @@
 from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import threading
+import time
 import uuid
 import re
 from datetime import datetime
+from app.core.config import settings
 from app.models.chat import (
     ConversationState, ChatMessage, MessageRole, UserContext, 
     ChatRequest, ChatResponse
@@ -12,10 +16,43 @@ from app.models.hotel import Hotel
 # In-memory storage for conversation states (in production, use Redis or database)
 conversation_storage: Dict[str, ConversationState] = {}
 
+class PrefetchedSearch:
+    """A speculative search fired for a session before it was ready to search"""
+    def __init__(self, context: UserContext, query: str, future: "Future[List[Hotel]]"):
+        self.context = context
+        self.query = query
+        self.future = future
+        self.created_at = time.monotonic()
+    
+    def expired(self) -> bool:
+        return time.monotonic() - self.created_at > settings.SPECULATIVE_TTL_SECONDS
+
+# Speculative search results parked per session until the next turn picks them up.
+# Oldest first (insertion order), so eviction can pop from the front.
+prefetch_storage: Dict[str, PrefetchedSearch] = {}
+
+
+def _evict_prefetches() -> None:
+    """Drop expired prefetches and keep at most SPECULATIVE_MAX_PARKED parked"""
+    # list() snapshots the items so concurrent turns can't break the iteration
+    for session_id, prefetched in list(prefetch_storage.items()):
+        if not prefetched.expired() and len(prefetch_storage) < settings.SPECULATIVE_MAX_PARKED:
+            break
+        if prefetch_storage.pop(session_id, None) is prefetched:
+            prefetched.future.cancel()
+
 class ChatService:
     def __init__(self):
         self.required_info = ["location"]  # Minimum required info for search
         self.optional_info = ["check_in_date", "check_out_date", "guests", "budget_range", "hotel_type"]
+        
+        # Bounded pool for speculative searches; when all slots are busy we skip the prefetch
+        # instead of queueing it, so speculation never competes with real searches for long
+        self._prefetch_executor = ThreadPoolExecutor(
+            max_workers=settings.SPECULATIVE_MAX_CONCURRENCY,
+            thread_name_prefix="speculative-search"
+        )
+        self._prefetch_slots = threading.BoundedSemaphore(settings.SPECULATIVE_MAX_CONCURRENCY)
     
     def _extract_user_info(self, message: str, current_context: UserContext) -> UserContext:
         """Extract hotel-related information from user message"""
@@ -179,6 +216,106 @@ class ChatService:
         
         return " ".join(query_parts)
     
+    def _start_prefetch(self, session_id: str, context: UserContext) -> None:
+        """Fire a background search for the partial context while we ask for more details"""
+        if not settings.SPECULATIVE_SEARCH or not context.location:
+            return
+        
+        search_query = self._build_search_query(context)
+        existing = prefetch_storage.get(session_id)
+        if existing and existing.query == search_query:
+            return
+        
+        if not self._prefetch_slots.acquire(blocking=False):
+            return
+        
+        snapshot = context.model_copy(deep=True)
+        try:
+            future = self._prefetch_executor.submit(
+                recommend_hotels, search_query, settings.SPECULATIVE_TOP_K, snapshot
+            )
+        except RuntimeError:
+            # Executor is shutting down
+            self._prefetch_slots.release()
+            return
+        future.add_done_callback(lambda _: self._prefetch_slots.release())
+        
+        if existing:
+            existing.future.cancel()
+            prefetch_storage.pop(session_id, None)
+        _evict_prefetches()
+        prefetch_storage[session_id] = PrefetchedSearch(
+            context=snapshot,
+            query=search_query,
+            future=future
+        )
+    
+    def _context_narrows(self, previous: UserContext, current: UserContext) -> bool:
+        """Check that the current context only adds constraints on top of the previous one"""
+        if previous.location != current.location:
+            return False
+        
+        for field in ["hotel_type", "budget_range", "guests"]:
+            previous_value = getattr(previous, field)
+            if previous_value is not None and previous_value != getattr(current, field):
+                return False
+        
+        return set(previous.preferred_amenities).issubset(current.preferred_amenities)
+    
+    def _refine_hotels(self, hotels: List[Hotel], previous: UserContext, current: UserContext) -> List[Hotel]:
+        """Filter prefetched hotels down to the amenities and hotel type added since the prefetch"""
+        new_amenities = [a for a in current.preferred_amenities if a not in previous.preferred_amenities]
+        new_type = current.hotel_type if current.hotel_type != previous.hotel_type else None
+        
+        refined = []
+        for hotel in hotels:
+            amenity_text = " ".join(
+                item for items in hotel.amenities.values() for item in items
+            ).lower()
+            hotel_text = " ".join([hotel.title, hotel.description, *hotel.highlights]).lower()
+            
+            if any(amenity not in amenity_text and amenity not in hotel_text for amenity in new_amenities):
+                continue
+            if new_type and new_type not in hotel_text:
+                continue
+            refined.append(hotel)
+        
+        return refined
+    
+    def _take_prefetched(self, session_id: str, context: UserContext, top_k: int) -> Optional[List[Hotel]]:
+        """Reuse a speculative search for this session, or return None if a fresh search is needed"""
+        prefetched = prefetch_storage.pop(session_id, None)
+        if not prefetched:
+            return None
+        
+        if prefetched.expired():
+            prefetched.future.cancel()
+            return None
+        
+        if not self._context_narrows(prefetched.context, context):
+            prefetched.future.cancel()
+            return None
+        
+        try:
+            # The search is already in flight, so waiting on it briefly beats starting over
+            hotels = prefetched.future.result(timeout=settings.SPECULATIVE_WAIT_SECONDS)
+        except FutureTimeoutError:
+            print(f"⚠️ Speculative search still running after {settings.SPECULATIVE_WAIT_SECONDS}s, searching again")
+            prefetched.future.cancel()
+            return None
+        except Exception as e:
+            print(f"❌ Speculative search failed: {e}")
+            return None
+        
+        if prefetched.query != self._build_search_query(context):
+            hotels = self._refine_hotels(hotels, prefetched.context, context)
+        
+        # Too few survivors means the prefetch was too broad; let the caller search properly
+        if len(hotels) < top_k:
+            return None
+        
+        return hotels[:top_k]
+    
     def process_message(self, request: ChatRequest) -> ChatResponse:
         """Main method to process user messages and manage conversation flow"""
         
@@ -218,7 +355,9 @@ class ChatService:
             search_query = self._build_search_query(updated_context)
             state.last_query = search_query
             
-            hotels = recommend_hotels(search_query, top_k=3)
+            hotels = self._take_prefetched(request.session_id, updated_context, top_k=3)
+            if hotels is None:
+                hotels = recommend_hotels(search_query, top_k=3, context=updated_context)
             
             if hotels:
                 response_message = f"Great! I found some excellent hotels in {updated_context.location} for you:\n\n"
@@ -237,17 +376,8 @@ class ChatService:
                     response_message += f"   • Location: {hotel.location.lat:.4f}, {hotel.location.lon:.4f}\n"
                     response_message += "\n"
                     
-                    # Convert hotel to dict for response
-                    suggested_hotels.append({
-                        "id": hotel.id,
-                        "title": hotel.title,
-                        "description": hotel.description,
-                        "amenities": hotel.amenities,
-                        "location": {"lat": hotel.location.lat, "lon": hotel.location.lon},
-                        "highlights": hotel.highlights,
-                        "local_tips": hotel.local_tips,
-                        "url": hotel.url
-                    })
+                    # Hotels are serialized once, directly from the model, by the endpoint
+                    suggested_hotels.append(hotel)
                 
                 response_message += "Would you like more details about any of these hotels, or would you like me to search with different criteria?"
             else:
@@ -256,6 +386,9 @@ class ChatService:
         else:
             # Ask for missing information
             response_message = self._generate_clarifying_question(missing_info, updated_context)
+            
+            # Meanwhile, start searching with what we already know
+            self._start_prefetch(request.session_id, updated_context)
         
         # Add assistant message to conversation
         assistant_message = ChatMessage(
@@ -277,12 +410,20 @@ class ChatService:
             suggested_hotels=suggested_hotels
         )
     
+    def shutdown(self) -> None:
+        """Cancel pending speculative searches so the worker can exit promptly"""
+        self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+    
     def get_conversation_history(self, session_id: str) -> Optional[ConversationState]:
         """Get conversation history for a session"""
         return conversation_storage.get(session_id)
     
     def clear_conversation(self, session_id: str) -> bool:
         """Clear conversation history for a session"""
+        prefetched = prefetch_storage.pop(session_id, None)
+        if prefetched:
+            prefetched.future.cancel()
+        
         if session_id in conversation_storage:
             del conversation_storage[session_id]
             return True
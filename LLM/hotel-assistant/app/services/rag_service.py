@@ -1,11 +1,79 @@
 from langchain_openai import OpenAIEmbeddings
 from langchain_elasticsearch import ElasticsearchStore
+from elasticsearch import ConnectionError as ESConnectionError, ConnectionTimeout
 from app.core.config import settings
+from app.models.chat import UserContext
 from app.models.hotel import Hotel, Location
+from app.services.rerank_service import fetch_size, rerank_hotels
+from app.services.snapshot_service import get_snapshot, recommend_hotels_from_snapshot
+from typing import Optional
+import os
+import time
 import requests
 
 embeddings = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY)  # type: ignore
 
+# Circuit breaker: after Elasticsearch becomes unreachable, skip it until this
+# monotonic time so outage traffic goes straight to the snapshot instead of
+# waiting on timeouts. Only used when there is a snapshot to serve; without one
+# every request checks ES again, so recovery is picked up immediately.
+_es_down_until = 0.0
+
+
+def _snapshot_available() -> bool:
+    snapshot = get_snapshot()
+    return snapshot is not None and len(snapshot) > 0
+
+
+def _mark_es_down() -> None:
+    global _es_down_until
+    if _snapshot_available():
+        _es_down_until = time.monotonic() + settings.ES_CIRCUIT_OPEN_SECONDS
+
+
+def _es_circuit_open() -> bool:
+    return time.monotonic() < _es_down_until and _snapshot_available()
+
+
+def ensure_vector_index() -> None:
+    """Create the hotel index with quantized vector storage if it doesn't exist yet.
+
+    Called from the app's startup (lifespan), never at import: with gunicorn's
+    preload_app an unreachable cluster would otherwise hang the master.
+    """
+    try:
+        index_url = f"{settings.ES_URL}/{settings.ES_INDEX}"
+        if requests.head(index_url, timeout=settings.ES_TIMEOUT_SECONDS).status_code == 200:
+            return
+        
+        for index_type in [settings.ES_VECTOR_INDEX_TYPE, "hnsw"]:
+            mapping = {
+                "mappings": {
+                    "properties": {
+                        "vector": {
+                            "type": "dense_vector",
+                            "dims": settings.EMBEDDING_DIMS,
+                            "index": True,
+                            "similarity": "cosine",
+                            "index_options": {"type": index_type}
+                        },
+                        "text": {"type": "text"},
+                        "metadata": {"type": "object"}
+                    }
+                }
+            }
+            response = requests.put(index_url, json=mapping, timeout=settings.ES_TIMEOUT_SECONDS)
+            if response.status_code == 200:
+                print(f"✅ Created index '{settings.ES_INDEX}' with {index_type} vectors")
+                return
+            # Another worker created it between our HEAD and PUT
+            if "resource_already_exists_exception" in response.text:
+                return
+            print(f"❌ Could not create index with {index_type} vectors: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error creating vector index: {e}")
+
+
 # es_store = ElasticsearchStore(
 #     index_name=settings.ES_INDEX,
 #     es_url=settings.ES_URL,
@@ -14,31 +82,49 @@ embeddings = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY)  # type: ignore
 #     embedding=embeddings,
 # )
 
-es_store = ElasticsearchStore.from_documents(
-    documents=[],  # empty or preloaded LangChain documents
-    embedding=embeddings,
-    index_name=settings.ES_INDEX,
-    es_url=settings.ES_URL,
-    # es_user=settings.ES_USER,
-    # es_password=settings.ES_PASS,
-    # strategy="script_score"  # Use script_score to avoid KNN incompatibility
-)
+_es_store: Optional[ElasticsearchStore] = None
+_es_store_pid: Optional[int] = None
+
+
+def get_es_store() -> ElasticsearchStore:
+    """Vector store for the current process.
+
+    Created lazily so the app can be preloaded before forking workers: an ES
+    client created in the master would share its pooled connections with
+    every worker.
+    """
+    global _es_store, _es_store_pid
+    if _es_store is None or _es_store_pid != os.getpid():
+        _es_store = ElasticsearchStore.from_documents(
+            documents=[],  # empty or preloaded LangChain documents
+            embedding=embeddings,
+            index_name=settings.ES_INDEX,
+            es_url=settings.ES_URL,
+            # Bound every search, not just our own requests calls
+            es_params={"request_timeout": settings.ES_TIMEOUT_SECONDS, "max_retries": 0},
+            # es_user=settings.ES_USER,
+            # es_password=settings.ES_PASS,
+            # strategy="script_score"  # Use script_score to avoid KNN incompatibility
+        )
+        _es_store_pid = os.getpid()
+    return _es_store
 
 
 def check_elasticsearch_status():
     """Check if Elasticsearch is running and the index exists with documents."""
     try:
         # Check if Elasticsearch is running
-        health_response = requests.get(f"{settings.ES_URL}/_cluster/health")
+        health_response = requests.get(f"{settings.ES_URL}/_cluster/health", timeout=settings.ES_TIMEOUT_SECONDS)
         if health_response.status_code == 200:
             health_data = health_response.json()
             print(f"✅ Elasticsearch is running. Status: {health_data.get('status')}")
         else:
             print(f"❌ Elasticsearch health check failed: {health_response.status_code}")
+            _mark_es_down()
             return False
         
         # Check if the index exists
-        index_response = requests.get(f"{settings.ES_URL}/{settings.ES_INDEX}")
+        index_response = requests.get(f"{settings.ES_URL}/{settings.ES_INDEX}", timeout=settings.ES_TIMEOUT_SECONDS)
         if index_response.status_code == 200:
             index_data = index_response.json()
             
@@ -57,7 +143,7 @@ def check_elasticsearch_status():
                     doc_count = index_info['docs'].get('count', 0)
                 else:
                     # Try to get count from stats
-                    stats_response = requests.get(f"{settings.ES_URL}/{settings.ES_INDEX}/_stats")
+                    stats_response = requests.get(f"{settings.ES_URL}/{settings.ES_INDEX}/_stats", timeout=settings.ES_TIMEOUT_SECONDS)
                     if stats_response.status_code == 200:
                         stats_data = stats_response.json()
                         doc_count = stats_data.get('indices', {}).get(settings.ES_INDEX, {}).get('total', {}).get('docs', {}).get('count', 0)
@@ -70,30 +156,46 @@ def check_elasticsearch_status():
             
     except Exception as e:
         print(f"❌ Error checking Elasticsearch status: {e}")
+        # Unreachable cluster; a missing or empty index (e.g. mid-reindex) doesn't open the circuit
+        _mark_es_down()
         return False
 
 
-def recommend_hotels(query: str, top_k: int = 5) -> list[Hotel]:
+def recommend_hotels(query: str, top_k: int = 5, context: Optional[UserContext] = None) -> list[Hotel]:
+    if _es_circuit_open():
+        return recommend_hotels_from_snapshot(query, top_k, context)
+    
     # Check Elasticsearch status first
     if not check_elasticsearch_status():
         print("❌ Elasticsearch is not available or index is empty")
-        return []
+        return recommend_hotels_from_snapshot(query, top_k, context)
+    
+    # Over-fetch candidates when we have preferences to rerank them by
+    k = fetch_size(top_k, context)
     
     try:
         # First, let's try the LangChain search to see what it returns
-        results = es_store.similarity_search(query, k=top_k)
+        results_with_scores = get_es_store().similarity_search_with_score(query, k=k)
         
-        if len(results) == 0:
+        if len(results_with_scores) == 0:
             print("❌ No results found from LangChain search")
             return []
         
+        results = [r for r, _ in results_with_scores]
+        similarities = [score for _, score in results_with_scores]
+        
         # If LangChain results are empty, try direct Elasticsearch query
         if not results[0].metadata and len(results[0].page_content) == 0:
-            return recommend_hotels_direct(query, top_k)
+            return recommend_hotels_direct(query, top_k, context)
         
+    except (ESConnectionError, ConnectionTimeout) as e:
+        # The cluster is unreachable or too slow; the direct query would wait just as long
+        print(f"❌ Elasticsearch search timed out or failed to connect: {e}")
+        _mark_es_down()
+        return recommend_hotels_from_snapshot(query, top_k, context)
     except Exception as e:
         print(f"❌ Error during LangChain search: {e}")
-        return recommend_hotels_direct(query, top_k)
+        return recommend_hotels_direct(query, top_k, context)
     
     hotels = []
     
@@ -140,10 +242,55 @@ def recommend_hotels(query: str, top_k: int = 5) -> list[Hotel]:
         
         hotels.append(hotel)
     
-    return hotels
+    return rerank_hotels(hotels, similarities, context, top_k)
+
+
+def hotel_from_source(doc: dict) -> Hotel:
+    """Build a Hotel from an indexed hotel document (_source)."""
+    # Extract data from the document
+    basics = doc.get("basics", {})
+    amenities = {
+        key: value for key, value in doc.get("amenities", {}).items()
+        if value
+    }
+    all_locations = doc.get("allLocations", [])
+    
+    # Handle location data
+    location = None
+    if all_locations and len(all_locations) > 0:
+        loc_data = all_locations[0].get("locations", {})
+        if loc_data:
+            location = Location(
+                lon=loc_data.get("lon", 0.0),
+                lat=loc_data.get("lat", 0.0)
+            )
+    
+    # Handle highlights and local_tips
+    highlights = basics.get("highlights", "")
+    if isinstance(highlights, str):
+        highlights = [h.strip() for h in highlights.split(",") if h.strip()]
+    elif not isinstance(highlights, list):
+        highlights = []
+        
+    local_tips = basics.get("local_tips", "")
+    if isinstance(local_tips, str):
+        local_tips = [tip.strip() for tip in local_tips.split(",") if tip.strip()]
+    elif not isinstance(local_tips, list):
+        local_tips = []
+    
+    return Hotel(
+        id=basics.get("id", ""),
+        title=basics.get("title", basics.get("name", "")),
+        description=doc.get("embedding_text", ""),
+        amenities=amenities,
+        location=location or Location(lon=0.0, lat=0.0),
+        highlights=highlights,
+        local_tips=local_tips,
+        url=basics.get("url", "")
+    )
 
 
-def recommend_hotels_direct(query: str, top_k: int = 5) -> list[Hotel]:
+def recommend_hotels_direct(query: str, top_k: int = 5, context: Optional[UserContext] = None) -> list[Hotel]:
     """Direct Elasticsearch query as fallback when LangChain doesn't work."""
     
     try:
@@ -156,71 +303,34 @@ def recommend_hotels_direct(query: str, top_k: int = 5) -> list[Hotel]:
                     "type": "best_fields"
                 }
             },
-            "size": top_k
+            "size": fetch_size(top_k, context)
         }
         
         search_response = requests.post(
             f"{settings.ES_URL}/{settings.ES_INDEX}/_search",
-            json=search_query
+            json=search_query,
+            timeout=settings.ES_TIMEOUT_SECONDS
         )
         
         if search_response.status_code != 200:
             print(f"❌ Direct search failed: {search_response.status_code}")
-            return []
+            return recommend_hotels_from_snapshot(query, top_k, context)
         
         search_data = search_response.json()
         hits = search_data.get("hits", {}).get("hits", [])
         
         hotels = []
+        similarities = []
         for hit in hits:
-            doc = hit["_source"]
-            
-            # Extract data from the document
-            basics = doc.get("basics", {})
-            amenities = {
-                key: value for key, value in doc.get("amenities", {}).items()
-                if value
-            }
-            all_locations = doc.get("allLocations", [])
-            
-            # Handle location data
-            location = None
-            if all_locations and len(all_locations) > 0:
-                loc_data = all_locations[0].get("locations", {})
-                if loc_data:
-                    location = Location(
-                        lon=loc_data.get("lon", 0.0),
-                        lat=loc_data.get("lat", 0.0)
-                    )
-            
-            # Handle highlights and local_tips
-            highlights = basics.get("highlights", "")
-            if isinstance(highlights, str):
-                highlights = [h.strip() for h in highlights.split(",") if h.strip()]
-            elif not isinstance(highlights, list):
-                highlights = []
-                
-            local_tips = basics.get("local_tips", "")
-            if isinstance(local_tips, str):
-                local_tips = [tip.strip() for tip in local_tips.split(",") if tip.strip()]
-            elif not isinstance(local_tips, list):
-                local_tips = []
-            
-            hotel = Hotel(
-                id=basics.get("id", ""),
-                title=basics.get("title", basics.get("name", "")),
-                description=doc.get("embedding_text", ""),
-                amenities=amenities,
-                location=location or Location(lon=0.0, lat=0.0),
-                highlights=highlights,
-                local_tips=local_tips,
-                url=basics.get("url", "")
-            )
-            
-            hotels.append(hotel)
+            hotels.append(hotel_from_source(hit["_source"]))
+            similarities.append(hit.get("_score") or 0.0)
         
-        return hotels
+        return rerank_hotels(hotels, similarities, context, top_k)
         
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error in direct search: {e}")
+        _mark_es_down()
+        return recommend_hotels_from_snapshot(query, top_k, context)
     except Exception as e:
         print(f"❌ Error in direct search: {e}")
-        return []
+        return recommend_hotels_from_snapshot(query, top_k, context)
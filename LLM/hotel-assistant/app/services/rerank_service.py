@@ -0,0 +1,134 @@
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.chat import UserContext
+from app.models.hotel import Hotel
+
+EARTH_RADIUS_KM = 6371.0
+
+# Moving average of rerank time per candidate, used to size the next rerank to
+# the budget before doing any work (starts at a conservative guess)
+_seconds_per_candidate = 50e-6
+
+
+def fetch_size(top_k: int, context: Optional[UserContext]) -> int:
+    """How many candidates to retrieve so the rerank stage has something to choose from"""
+    if settings.RERANK_ENABLED and _has_preferences(context):
+        return top_k * max(settings.RERANK_OVERFETCH, 1)
+    return top_k
+
+
+def _has_preferences(context: Optional[UserContext]) -> bool:
+    return bool(context and (context.location or context.preferred_amenities or context.hotel_type))
+
+
+def _hotel_text(hotel: Hotel) -> str:
+    return " ".join([hotel.title, hotel.description, *hotel.highlights, *hotel.local_tips]).lower()
+
+
+def _amenity_text(hotel: Hotel) -> str:
+    return " ".join(item for items in hotel.amenities.values() for item in items).lower()
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    spread = values.max() - values.min()
+    if spread <= 0:
+        return np.ones_like(values)
+    return (values - values.min()) / spread
+
+
+def _geo_scores(hotels: Sequence[Hotel], texts: Sequence[str], location: Optional[str]) -> np.ndarray:
+    """Closeness to the area the user asked for.
+
+    We don't geocode the requested location; instead we take the median
+    coordinates of the candidates that mention it and score everyone by
+    distance from there, which pushes out candidates from the wrong city.
+    """
+    coords = np.array([[h.location.lat, h.location.lon] for h in hotels], dtype=np.float64)
+    known = np.any(coords != 0.0, axis=1)
+    if not location or not known.any():
+        return np.zeros(len(hotels))
+
+    mentions = np.array([location.lower() in text for text in texts]) & known
+    anchor_rows = mentions if mentions.any() else known
+    center = np.radians(np.median(coords[anchor_rows], axis=0))
+
+    lat, lon = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+    a = (
+        np.sin((lat - center[0]) / 2) ** 2
+        + np.cos(lat) * np.cos(center[0]) * np.sin((lon - center[1]) / 2) ** 2
+    )
+    distance_km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    return np.where(known, np.exp(-distance_km / settings.RERANK_GEO_SCALE_KM), 0.0)
+
+
+def _candidate_limit(top_k: int, budget: float) -> int:
+    """How many candidates we expect to score within the budget (never fewer than top_k)"""
+    return max(top_k, int(budget / _seconds_per_candidate))
+
+
+def rerank_hotels(hotels: list[Hotel], similarities: Sequence[float],
+                  context: Optional[UserContext], top_k: int) -> list[Hotel]:
+    """Rescore over-fetched candidates by similarity, amenity overlap, geo distance and type match.
+
+    RERANK_BUDGET_MS is enforced before scoring: only as many of the best
+    retrieved candidates as fit in the budget are rescored, and the geo
+    feature is skipped if the text features already used up the budget.
+    """
+    global _seconds_per_candidate
+    if not settings.RERANK_ENABLED or not _has_preferences(context) or len(hotels) <= 1:
+        return hotels[:top_k]
+
+    started = time.perf_counter()
+    budget = settings.RERANK_BUDGET_MS / 1000.0
+
+    # Retrieval order is best first, so trimming drops the least similar candidates
+    limit = _candidate_limit(top_k, budget)
+    hotels, similarities = hotels[:limit], list(similarities)[:limit]
+
+    texts = [_hotel_text(h) for h in hotels]
+    amenity_texts = [_amenity_text(h) for h in hotels]
+
+    # (n_hotels, n_preferred) match matrix -> fraction of preferred amenities each hotel has
+    preferred = context.preferred_amenities
+    if preferred:
+        matches = np.array([
+            [amenity in amenity_text or amenity in text for amenity in preferred]
+            for amenity_text, text in zip(amenity_texts, texts)
+        ], dtype=np.float64)
+        amenity_scores = matches.mean(axis=1)
+    else:
+        amenity_scores = np.zeros(len(hotels))
+
+    hotel_type = context.hotel_type
+    type_scores = np.array([float(bool(hotel_type) and hotel_type in text) for text in texts])
+
+    if time.perf_counter() - started > budget:
+        print("⚠️ Rerank budget used up by text features, skipping geo distance")
+        geo_scores = np.zeros(len(hotels))
+    else:
+        geo_scores = _geo_scores(hotels, texts, context.location)
+
+    features = np.column_stack([
+        _min_max(np.asarray(similarities, dtype=np.float64)),
+        amenity_scores,
+        geo_scores,
+        type_scores,
+    ])
+    weights = np.array([
+        settings.RERANK_WEIGHT_SIMILARITY,
+        settings.RERANK_WEIGHT_AMENITIES,
+        settings.RERANK_WEIGHT_GEO,
+        settings.RERANK_WEIGHT_TYPE,
+    ])
+    scores = features @ weights
+
+    elapsed = time.perf_counter() - started
+    _seconds_per_candidate = 0.8 * _seconds_per_candidate + 0.2 * elapsed / len(hotels)
+
+    # Stable sort keeps retrieval order between equally scored hotels
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [hotels[i] for i in order]
@@ -0,0 +1,348 @@
+"""Local snapshot of the hotel catalog for degraded-mode serving.
+
+When Elasticsearch is down or being reindexed, searches fall back to a copy
+of the catalog that is refreshed periodically from ES. A snapshot is a
+directory of flat columns that are memory-mapped on load:
+
+- hotels.bin + offsets.npy: the Hotel records as JSON, back to back
+- postings_ptr.npy / postings_doc.npy / postings_weight.npy: an inverted
+  index of hashed terms with tf-idf weights, for lexical search
+- vectors/: optional int8 vector index (see vector_index.py)
+
+SNAPSHOT_DIR/CURRENT names the live snapshot; a refresh builds a new
+directory next to it and then swaps CURRENT, so readers never see a
+half-written snapshot.
+"""
+import fcntl
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import requests
+from langchain_openai import OpenAIEmbeddings
+
+from app.core.config import settings
+from app.models.chat import UserContext
+from app.models.hotel import Hotel
+from app.services.rerank_service import fetch_size, rerank_hotels
+from app.services.vector_index import QuantizedVectorIndex
+
+N_BUCKETS = 1 << 18
+CURRENT_FILE = "CURRENT"
+SCROLL_TIMEOUT_SECONDS = 30
+# How often readers look for a newer snapshot
+RELOAD_CHECK_SECONDS = 5.0
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_query_embeddings = None
+
+
+def _embed_query(query: str) -> np.ndarray:
+    """Embed a query for degraded-mode vector search, with a short timeout and no retries"""
+    global _query_embeddings
+    if _query_embeddings is None:
+        _query_embeddings = OpenAIEmbeddings(
+            api_key=settings.OPENAI_API_KEY,  # type: ignore
+            timeout=settings.SNAPSHOT_EMBEDDING_TIMEOUT_SECONDS,
+            max_retries=0,
+        )
+    return np.asarray(_query_embeddings.embed_query(query), dtype=np.float32)
+
+
+def _buckets(text: str) -> List[int]:
+    # crc32 rather than hash(): buckets must match across processes and restarts
+    return [zlib.crc32(token.encode()) % N_BUCKETS for token in _TOKEN.findall(text.lower())]
+
+
+def _searchable_text(hotel: Hotel) -> str:
+    amenities = " ".join(item for items in hotel.amenities.values() for item in items)
+    # Title twice so name matches outweigh passing mentions
+    return " ".join([hotel.title, hotel.title, hotel.description, *hotel.highlights, amenities])
+
+
+class HotelSnapshot:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.name = directory.name
+        self.manifest = json.loads((directory / "manifest.json").read_text())
+
+        self._offsets = np.load(directory / "offsets.npy", mmap_mode="r")
+        self._hotels = (
+            np.memmap(directory / "hotels.bin", dtype=np.uint8, mode="r")
+            if self.manifest["count"] else np.zeros(0, dtype=np.uint8)
+        )
+        self._postings_ptr = np.load(directory / "postings_ptr.npy", mmap_mode="r")
+        self._postings_doc = np.load(directory / "postings_doc.npy", mmap_mode="r")
+        self._postings_weight = np.load(directory / "postings_weight.npy", mmap_mode="r")
+
+        self.vector_index = None
+        if (directory / "vectors").exists():
+            self.vector_index = QuantizedVectorIndex.load(directory / "vectors")
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    def hotel(self, row: int) -> Hotel:
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return Hotel.model_validate_json(self._hotels[start:end].tobytes())
+
+    def _lexical_scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self), dtype=np.float32)
+        for bucket, count in Counter(_buckets(query)).items():
+            start, end = self._postings_ptr[bucket], self._postings_ptr[bucket + 1]
+            # Each document appears at most once per bucket, so += is safe here
+            scores[self._postings_doc[start:end]] += self._postings_weight[start:end] * (1 + math.log(count))
+        return scores
+
+    def search(self, query: str, k: int) -> List[Tuple[Hotel, float]]:
+        if not len(self):
+            return []
+
+        scores = self._lexical_scores(query)
+
+        if settings.SNAPSHOT_VECTOR_SEARCH and self.vector_index is not None:
+            try:
+                query_vector = _embed_query(query)
+                for row, similarity in self.vector_index.search(query_vector, k=k):
+                    scores[int(row)] += similarity
+            except Exception as e:
+                print(f"❌ Snapshot vector search failed, using lexical only: {e}")
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.hotel(int(row)), float(scores[row])) for row in top if scores[row] > 0]
+
+
+def _scroll_sources() -> Iterator[dict]:
+    """Every document in the hotel index, via the scroll API"""
+    response = requests.post(
+        f"{settings.ES_URL}/{settings.ES_INDEX}/_search",
+        params={"scroll": "2m"},
+        json={"size": 500, "sort": ["_doc"]},
+        timeout=SCROLL_TIMEOUT_SECONDS
+    )
+    response.raise_for_status()
+    data = response.json()
+    scroll_id = data.get("_scroll_id")
+    try:
+        while data["hits"]["hits"]:
+            for hit in data["hits"]["hits"]:
+                yield hit["_source"]
+            response = requests.post(
+                f"{settings.ES_URL}/_search/scroll",
+                json={"scroll": "2m", "scroll_id": scroll_id},
+                timeout=SCROLL_TIMEOUT_SECONDS
+            )
+            response.raise_for_status()
+            data = response.json()
+            scroll_id = data.get("_scroll_id", scroll_id)
+    finally:
+        if scroll_id:
+            try:
+                requests.delete(
+                    f"{settings.ES_URL}/_search/scroll",
+                    json={"scroll_id": scroll_id},
+                    timeout=SCROLL_TIMEOUT_SECONDS
+                )
+            except requests.RequestException:
+                pass  # The scroll context expires on its own
+
+
+def _parse_source(source: dict) -> Tuple[Hotel, Optional[list]]:
+    from app.services.rag_service import hotel_from_source
+
+    vector = source.get(settings.SNAPSHOT_VECTOR_FIELD)
+    # Documents written through LangChain nest the hotel under "metadata"
+    if "basics" not in source and isinstance(source.get("metadata"), dict):
+        source = {**source["metadata"], "embedding_text": source.get("text", "")}
+    return hotel_from_source(source), vector
+
+
+def build_snapshot(root: Path, sources: Iterator[dict]) -> Path:
+    """Write a new snapshot directory under root and make it the current one"""
+    name = f"snapshot-{time.time_ns()}"
+    tmp_dir = root / f".{name}.tmp"
+    tmp_dir.mkdir(parents=True)
+
+    try:
+        offsets = [0]
+        term_buckets, term_docs, term_counts = [], [], []
+        # Vectors go to disk as float32 as they arrive; they are only kept
+        # if every document has one, all of the same size
+        vector_dims: Optional[int] = None
+        all_vectors = True
+
+        with open(tmp_dir / "hotels.bin", "wb") as hotels_file, \
+                open(tmp_dir / "vectors.f32", "wb") as vectors_file:
+            for row, source in enumerate(sources):
+                hotel, vector = _parse_source(source)
+                record = hotel.model_dump_json().encode("utf-8")
+                hotels_file.write(record)
+                offsets.append(offsets[-1] + len(record))
+
+                if all_vectors and isinstance(vector, list) and vector and vector_dims in (None, len(vector)):
+                    vector_dims = len(vector)
+                    vectors_file.write(np.asarray(vector, dtype=np.float32).tobytes())
+                else:
+                    all_vectors = False
+
+                counts = Counter(_buckets(_searchable_text(hotel)))
+                term_buckets.extend(counts.keys())
+                term_counts.extend(counts.values())
+                term_docs.extend([row] * len(counts))
+
+        count = len(offsets) - 1
+        if count == 0:
+            raise ValueError("Hotel index returned no documents; keeping the previous snapshot")
+
+        buckets = np.array(term_buckets, dtype=np.int64)
+        docs = np.array(term_docs, dtype=np.uint32)
+        counts = np.array(term_counts, dtype=np.float32)
+
+        # tf-idf weights, L2-normalized per hotel
+        document_frequency = np.bincount(buckets, minlength=N_BUCKETS)
+        idf = np.log((1 + count) / (1 + document_frequency[buckets])) + 1
+        weights = ((1 + np.log(counts)) * idf).astype(np.float32)
+        norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=count))
+        weights /= norms[docs].astype(np.float32)
+
+        # Group postings by bucket (term-major), like a CSC matrix
+        order = np.lexsort((docs, buckets))
+        np.save(tmp_dir / "postings_ptr.npy", np.searchsorted(buckets[order], np.arange(N_BUCKETS + 1)))
+        np.save(tmp_dir / "postings_doc.npy", docs[order])
+        np.save(tmp_dir / "postings_weight.npy", weights[order])
+        np.save(tmp_dir / "offsets.npy", np.array(offsets, dtype=np.uint64))
+
+        if all_vectors:
+            vectors = np.memmap(tmp_dir / "vectors.f32", dtype=np.float32, mode="r",
+                                shape=(count, vector_dims))
+            QuantizedVectorIndex.build([str(i) for i in range(count)], vectors, "int8").save(tmp_dir / "vectors")
+            del vectors
+        os.remove(tmp_dir / "vectors.f32")
+
+        (tmp_dir / "manifest.json").write_text(json.dumps({"created_at": time.time(), "count": count}))
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    target = root / name
+    os.rename(tmp_dir, target)
+    _write_current(root, name)
+    _remove_old_snapshots(root, keep={name})
+    print(f"✅ Hotel snapshot {name} written with {count} hotels")
+    return target
+
+
+def _write_current(root: Path, name: str) -> None:
+    tmp_path = root / f".{CURRENT_FILE}.tmp"
+    tmp_path.write_text(name)
+    os.replace(tmp_path, root / CURRENT_FILE)
+
+
+def _remove_old_snapshots(root: Path, keep: set) -> None:
+    # Keep the newest previous snapshot too: other workers may still be reading it
+    snapshots = sorted(p for p in root.glob("snapshot-*") if p.is_dir())
+    old = [p for p in snapshots if p.name not in keep][:-1]
+    for path in old:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _current_directory(root: Path) -> Optional[Path]:
+    try:
+        return root / (root / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+_snapshot: Optional[HotelSnapshot] = None
+_snapshot_checked_at = 0.0
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot() -> Optional[HotelSnapshot]:
+    """The current snapshot, reloaded when a refresh has swapped in a newer one"""
+    global _snapshot, _snapshot_checked_at
+    if not settings.SNAPSHOT_DIR:
+        return None
+
+    if time.monotonic() - _snapshot_checked_at < RELOAD_CHECK_SECONDS and _snapshot is not None:
+        return _snapshot
+
+    with _snapshot_lock:
+        _snapshot_checked_at = time.monotonic()
+        directory = _current_directory(Path(settings.SNAPSHOT_DIR))
+        if directory is None:
+            return _snapshot
+        if _snapshot is None or _snapshot.name != directory.name:
+            try:
+                _snapshot = HotelSnapshot(directory)
+            except Exception as e:
+                print(f"❌ Could not load hotel snapshot {directory}: {e}")
+    return _snapshot
+
+
+def recommend_hotels_from_snapshot(query: str, top_k: int = 5,
+                                   context: Optional[UserContext] = None) -> list[Hotel]:
+    """Degraded-mode search over the local snapshot"""
+    snapshot = get_snapshot()
+    if snapshot is None or not len(snapshot):
+        print("❌ No local hotel snapshot available")
+        return []
+
+    results = snapshot.search(query, fetch_size(top_k, context))
+    print(f"⚠️ Serving hotels from local snapshot {snapshot.name}")
+    return rerank_hotels([hotel for hotel, _ in results], [score for _, score in results], context, top_k)
+
+
+def refresh_snapshot(force: bool = False) -> bool:
+    """Rebuild the snapshot from Elasticsearch if it is due. Only one process refreshes at a time."""
+    root = Path(settings.SNAPSHOT_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+
+    with open(root / ".lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False  # Another worker is refreshing
+
+        # Re-checked under the lock so workers don't rebuild right after each other
+        current = _current_directory(root)
+        if current is not None and not force:
+            try:
+                created_at = json.loads((current / "manifest.json").read_text())["created_at"]
+                if time.time() - created_at < settings.SNAPSHOT_REFRESH_SECONDS:
+                    return False
+            except (OSError, ValueError, KeyError):
+                pass
+
+        build_snapshot(root, _scroll_sources())
+        return True
+
+
+def _refresh_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            refresh_snapshot()
+        except Exception as e:
+            print(f"❌ Hotel snapshot refresh failed: {e}")
+        stop.wait(min(60.0, settings.SNAPSHOT_REFRESH_SECONDS))
+
+
+def start_snapshot_refresher() -> Optional[threading.Event]:
+    """Refresh the snapshot in a background thread; set the returned event to stop it"""
+    if not settings.SNAPSHOT_DIR:
+        return None
+    stop = threading.Event()
+    threading.Thread(target=_refresh_loop, args=(stop,), name="snapshot-refresh", daemon=True).start()
+    return stop
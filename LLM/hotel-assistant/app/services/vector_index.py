@@ -0,0 +1,251 @@
+"""Compact in-process vector index for hotel embeddings.
+
+OpenAI embeddings are 1536 float32 values (6 KB per hotel). This module keeps
+only quantized codes in RAM:
+
+- int8 scalar quantization: 1 byte per dimension (4x smaller)
+- product quantization (PQ): 1 byte per sub-vector (e.g. 96 bytes, ~35x
+  smaller than float32 once the codebooks are counted)
+
+Candidates are scored on the codes, then the best ones are re-ranked with
+the exact float vectors, which stay on disk and are memory-mapped so only the
+rows we touch get paged in.
+
+PQ scores are much coarser than int8 ones, so each quantizer has its own
+default re-rank depth. On 20k synthetic 1536-d vectors (see
+benchmarks/bench_vector_quantization.py) recall@10 is 1.000 for int8 at 50
+candidates, while PQ reaches 0.513 at 50 and 0.992 at 200.
+"""
+import json
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Rows scored per block, so the float32 upcast of the codes stays small
+_SCORE_BLOCK = 65536
+
+
+class ScalarQuantizer:
+    """Symmetric per-dimension int8 quantization"""
+    kind = "int8"
+    default_rerank = 50
+
+    def __init__(self, scale: Optional[np.ndarray] = None):
+        self.scale = scale
+
+    def fit(self, vectors: np.ndarray) -> "ScalarQuantizer":
+        # Block by block, so memory-mapped vectors are never copied whole
+        max_abs = np.zeros(vectors.shape[1], dtype=np.float32)
+        for start in range(0, len(vectors), _SCORE_BLOCK):
+            np.maximum(max_abs, np.abs(vectors[start:start + _SCORE_BLOCK]).max(axis=0), out=max_abs)
+        self.scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        for start in range(0, len(vectors), _SCORE_BLOCK):
+            block = vectors[start:start + _SCORE_BLOCK]
+            codes[start:start + len(block)] = np.clip(np.rint(block / self.scale), -127, 127)
+        return codes
+
+    def score(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # x . q ~= (codes * scale) . q == codes . (scale * q)
+        scaled_query = (query * self.scale).astype(np.float32)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _SCORE_BLOCK):
+            block = codes[start:start + _SCORE_BLOCK]
+            scores[start:start + len(block)] = block.astype(np.float32) @ scaled_query
+        return scores
+
+    def save(self, directory: Path) -> None:
+        np.save(directory / "scale.npy", self.scale)
+
+    @classmethod
+    def load(cls, directory: Path) -> "ScalarQuantizer":
+        return cls(scale=np.load(directory / "scale.npy"))
+
+
+class ProductQuantizer:
+    """Split vectors into sub-vectors and encode each as its nearest of 256 centroids"""
+    kind = "pq"
+    # PQ loses about half of recall@10 when re-ranking only 50 candidates
+    default_rerank = 200
+
+    def __init__(self, n_subvectors: int = 96, codebooks: Optional[np.ndarray] = None):
+        self.n_subvectors = n_subvectors
+        # Shape: (n_subvectors, 256, sub_dim)
+        self.codebooks = codebooks
+
+    def fit(self, vectors: np.ndarray, iterations: int = 20, sample_size: int = 20000,
+            seed: int = 0) -> "ProductQuantizer":
+        if vectors.shape[1] % self.n_subvectors:
+            raise ValueError(
+                f"Vector size {vectors.shape[1]} is not divisible by {self.n_subvectors} sub-vectors"
+            )
+        rng = np.random.default_rng(seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        sub_dim = vectors.shape[1] // self.n_subvectors
+        self.codebooks = np.stack([
+            _kmeans(vectors[:, j * sub_dim:(j + 1) * sub_dim], 256, iterations, rng)
+            for j in range(self.n_subvectors)
+        ])
+        return self
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        # (n, dim) -> (n_subvectors, n, sub_dim)
+        n = len(vectors)
+        return np.asarray(vectors, dtype=np.float32).reshape(n, self.n_subvectors, -1).transpose(1, 0, 2)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.empty((len(vectors), self.n_subvectors), dtype=np.uint8)
+        for start in range(0, len(vectors), _SCORE_BLOCK):
+            block = self._split(vectors[start:start + _SCORE_BLOCK])
+            for j, (sub, codebook) in enumerate(zip(block, self.codebooks)):
+                codes[start:start + len(sub), j] = _nearest(sub, codebook)
+        return codes
+
+    def score(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # Asymmetric distance: lookup table of <centroid, query sub-vector>
+        query_parts = np.asarray(query, dtype=np.float32).reshape(self.n_subvectors, -1)
+        lut = np.einsum("jcd,jd->jc", self.codebooks, query_parts)
+        rows = np.arange(self.n_subvectors)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _SCORE_BLOCK):
+            block = codes[start:start + _SCORE_BLOCK]
+            scores[start:start + len(block)] = lut[rows, block].sum(axis=1)
+        return scores
+
+    def save(self, directory: Path) -> None:
+        np.save(directory / "codebooks.npy", self.codebooks)
+
+    @classmethod
+    def load(cls, directory: Path) -> "ProductQuantizer":
+        codebooks = np.load(directory / "codebooks.npy")
+        return cls(n_subvectors=codebooks.shape[0], codebooks=codebooks)
+
+
+_QUANTIZERS = {ScalarQuantizer.kind: ScalarQuantizer, ProductQuantizer.kind: ProductQuantizer}
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    distances = (
+        (centroids ** 2).sum(axis=1)[None, :]
+        - 2.0 * vectors @ centroids.T
+    )
+    return distances.argmin(axis=1)
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = data[rng.choice(len(data), k, replace=len(data) < k)].copy()
+    for _ in range(iterations):
+        assignment = _nearest(data, centroids)
+        counts = np.bincount(assignment, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, data)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class QuantizedVectorIndex:
+    """Hotel ids + quantized codes in RAM, exact vectors memory-mapped for re-ranking"""
+
+    def __init__(self, ids: Sequence[str], codes: np.ndarray, quantizer,
+                 vectors: Optional[np.ndarray] = None):
+        self.ids = list(ids)
+        self.codes = codes
+        self.quantizer = quantizer
+        self.vectors = vectors
+
+    @classmethod
+    def build(cls, ids: Sequence[str], vectors: np.ndarray, kind: str = "int8",
+              **quantizer_options) -> "QuantizedVectorIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        quantizer = _QUANTIZERS[kind](**quantizer_options).fit(vectors)
+        return cls(ids, quantizer.encode(vectors), quantizer, vectors)
+
+    def search(self, query: np.ndarray, k: int = 5,
+               rerank: Optional[int] = None) -> list[tuple[str, float]]:
+        """Approximate top-k by inner product, re-ranked with exact vectors when available.
+
+        rerank defaults to the quantizer's default_rerank candidates.
+        """
+        if not self.ids:
+            return []
+        if rerank is None:
+            rerank = self.quantizer.default_rerank
+
+        query = np.asarray(query, dtype=np.float32)
+        scores = self.quantizer.score(self.codes, query)
+
+        n_candidates = min(max(k, rerank if self.vectors is not None else k), len(scores))
+        candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+
+        if self.vectors is not None:
+            # Fancy indexing on a memmap reads just these rows from disk
+            rows = np.sort(candidates)
+            exact = np.asarray(self.vectors[rows], dtype=np.float32) @ query
+            candidates, candidate_scores = rows, exact
+        else:
+            candidate_scores = scores[candidates]
+
+        order = np.argsort(-candidate_scores)[:k]
+        return [(self.ids[candidates[i]], float(candidate_scores[i])) for i in order]
+
+    def memory_bytes(self) -> int:
+        """Bytes held in RAM (memory-mapped exact vectors are not counted)"""
+        quantizer_bytes = sum(
+            arr.nbytes for arr in (getattr(self.quantizer, "scale", None),
+                                   getattr(self.quantizer, "codebooks", None))
+            if arr is not None
+        )
+        vector_bytes = 0
+        if self.vectors is not None and not isinstance(self.vectors, np.memmap):
+            vector_bytes = self.vectors.nbytes
+        return self.codes.nbytes + quantizer_bytes + vector_bytes
+
+    def save(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "codes.npy", self.codes)
+        if self.vectors is not None:
+            np.save(directory / "vectors.npy", np.asarray(self.vectors, dtype=np.float32))
+        self.quantizer.save(directory)
+        (directory / "index.json").write_text(json.dumps({"kind": self.quantizer.kind, "ids": self.ids}))
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = True) -> "QuantizedVectorIndex":
+        directory = Path(directory)
+        meta = json.loads((directory / "index.json").read_text())
+        mmap_mode = "r" if mmap else None
+        vectors = None
+        if (directory / "vectors.npy").exists():
+            vectors = np.load(directory / "vectors.npy", mmap_mode=mmap_mode)
+        return cls(
+            ids=meta["ids"],
+            codes=np.load(directory / "codes.npy", mmap_mode=mmap_mode),
+            quantizer=_QUANTIZERS[meta["kind"]].load(directory),
+            vectors=vectors,
+        )
+
+
+def exact_search(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    """Row indices of the exact top-k vectors by inner product"""
+    scores = np.asarray(vectors, dtype=np.float32) @ np.asarray(query, dtype=np.float32)
+    top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def recall_at_k(index: QuantizedVectorIndex, vectors: np.ndarray, queries: np.ndarray,
+                k: int = 10, rerank: Optional[int] = None) -> float:
+    """Fraction of the exact top-k that the quantized index also returns"""
+    hits = 0
+    for query in queries:
+        expected = {index.ids[i] for i in exact_search(vectors, query, k)}
+        found = {hotel_id for hotel_id, _ in index.search(query, k=k, rerank=rerank)}
+        hits += len(expected & found)
+    return hits / (k * len(queries))
@@ -0,0 +1,124 @@
+"""Compare the legacy and optimized ChatResponse serialization paths.
+
+Legacy: copy each Hotel into a dict, validate into the old ChatResponse (whose
+suggested_hotels were plain dicts), then let FastAPI re-validate against
+response_model and encode with jsonable_encoder + stdlib json. Optimized: keep
+Hotel models and dump once with pydantic-core.
+
+Run from the hotel-assistant directory:
+
+    python -m benchmarks.bench_response_serialization
+"""
+import gzip
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.core.responses import ModelJSONResponse
+from app.models.chat import ChatResponse, UserContext
+from app.models.hotel import Hotel, Location
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ITERATIONS = 2000
+
+
+class LegacyChatResponse(BaseModel):
+    """ChatResponse as it was before suggested_hotels became List[Hotel]"""
+    session_id: str
+    message: str
+    user_context: UserContext
+    missing_info: List[str]
+    ready_to_search: bool
+    suggested_hotels: Optional[List[Dict[str, Any]]] = None
+
+
+def make_hotels(count: int) -> list[Hotel]:
+    return [
+        Hotel(
+            id=f"hotel-{i}",
+            title=f"Grand Hotel {i}",
+            description="Elegant rooms with city views, close to the old town and the river. " * 4,
+            amenities={
+                "general": ["wifi", "parking", "24-hour front desk", "elevator"],
+                "wellness": ["pool", "spa", "fitness"],
+                "food": ["restaurant", "bar", "breakfast"],
+            },
+            location=Location(lon=2.3522 + i / 100, lat=48.8566 + i / 100),
+            highlights=["Rooftop terrace", "Near metro", "Family rooms"],
+            local_tips=["Visit the market on Sunday", "Try the bakery around the corner"],
+            url=f"https://example.com/hotels/{i}",
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_serialize(hotels: list[Hotel], context: UserContext) -> bytes:
+    suggested = [
+        {
+            "id": hotel.id,
+            "title": hotel.title,
+            "description": hotel.description,
+            "amenities": hotel.amenities,
+            "location": {"lat": hotel.location.lat, "lon": hotel.location.lon},
+            "highlights": hotel.highlights,
+            "local_tips": hotel.local_tips,
+            "url": hotel.url,
+        }
+        for hotel in hotels
+    ]
+    response = LegacyChatResponse(
+        session_id="bench",
+        message="Great! I found some excellent hotels for you.",
+        user_context=context,
+        missing_info=[],
+        ready_to_search=True,
+        suggested_hotels=suggested,
+    )
+    # What FastAPI does with response_model: validate again, then encode
+    validated = LegacyChatResponse.model_validate(response.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def optimized_serialize(hotels: list[Hotel], context: UserContext) -> bytes:
+    response = ChatResponse(
+        session_id="bench",
+        message="Great! I found some excellent hotels for you.",
+        user_context=context,
+        missing_info=[],
+        ready_to_search=True,
+        suggested_hotels=hotels,
+    )
+    return ModelJSONResponse(response).body
+
+
+def measure(fn, hotels: list[Hotel], context: UserContext) -> tuple[float, bytes]:
+    body = fn(hotels, context)
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        fn(hotels, context)
+    cpu_us = (time.process_time() - start) / ITERATIONS * 1e6
+    return cpu_us, body
+
+
+def main() -> None:
+    context = UserContext(location="Paris", guests=2, preferred_amenities=["pool", "spa"])
+
+    print(f"{'hotels':>6} {'path':>10} {'cpu us/resp':>12} {'raw B':>8} {'gzip B':>8} {'br B':>8}")
+    for count in (3, 10, 50):
+        hotels = make_hotels(count)
+        for name, fn in (("legacy", legacy_serialize), ("optimized", optimized_serialize)):
+            cpu_us, body = measure(fn, hotels, context)
+            gzip_size = len(gzip.compress(body))
+            br_size = len(brotli.compress(body)) if brotli else "-"
+            print(f"{count:>6} {name:>10} {cpu_us:>12.1f} {len(body):>8} {gzip_size:>8} {br_size:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Memory footprint and recall of the quantized hotel vector index vs exact search.
+
+Uses real embeddings when given a .npy file of shape (n_hotels, dims),
+otherwise clustered synthetic unit vectors of OpenAI embedding size.
+
+Run from the hotel-assistant directory:
+
+    python -m benchmarks.bench_vector_quantization [embeddings.npy]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.services.vector_index import QuantizedVectorIndex, recall_at_k
+
+N_QUERIES = 100
+K = 10
+
+
+def synthetic_embeddings(n: int = 20000, dims: int = 1536, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(100, dims))
+    vectors = centers[rng.integers(0, len(centers), n)] + 0.5 * rng.normal(size=(n, dims))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main() -> None:
+    vectors = np.load(sys.argv[1]).astype(np.float32) if len(sys.argv) > 1 else synthetic_embeddings()
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), N_QUERIES, replace=False)]
+    queries = queries + 0.05 * rng.normal(size=queries.shape).astype(np.float32)
+    ids = [str(i) for i in range(len(vectors))]
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, float32 = {vectors.nbytes / 1e6:.1f} MB")
+    print(f"{'index':>6} {'RAM MB':>8} {'ratio':>6} {'rerank':>7} {'recall@10':>10} {'ms/query':>9}")
+    for kind, options in (("int8", {}), ("pq", {"n_subvectors": 96})):
+        index = QuantizedVectorIndex.build(ids, vectors, kind, **options)
+        ram = index.memory_bytes() - index.vectors.nbytes  # exact vectors live on disk when loaded
+        for rerank in (0, 50, 200):
+            start = time.perf_counter()
+            recall = recall_at_k(index, vectors, queries, k=K, rerank=rerank)
+            # recall_at_k also runs one exact search per query; report the total as an upper bound
+            ms = (time.perf_counter() - start) / len(queries) * 1e3
+            print(f"{kind:>6} {ram / 1e6:>8.2f} {vectors.nbytes / ram:>6.1f} {rerank:>7} {recall:>10.3f} {ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Production launch: gunicorn manages a pool of uvicorn workers.
+#
+#   gunicorn -c gunicorn.conf.py app.main:app
+#
+# The app is imported once in the master (preload_app) so local indexes and
+# caches are shared copy-on-write by all workers.
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# One worker by default: chat sessions and prefetched searches live in
+# per-process memory and gunicorn has no session affinity, so with several
+# workers a conversation's turns land on workers that don't know it.
+# Raise WEB_CONCURRENCY only behind a load balancer with sticky sessions.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Seconds a worker gets to finish in-flight requests after SIGTERM
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth from per-session state
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the GC's reach: collections in the
+    # workers would otherwise write to these objects and un-share their pages
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded app, forking %s workers", workers)
+
+
+def worker_exit(server, worker):
+    from app.core.health import worker_health
+    worker_health.remove_heartbeat()
@@ -170,7 +170,13 @@ if ! (cd app && python -c "import main; print('✅ FastAPI app imports successfu
     echo -e "${RED}❌ Backend import failed. Check dependencies and code.${NC}"
     exit 1
 fi
-(cd app && python -m uvicorn main:app --reload --port 8000 --log-level error) >/dev/null 2>&1 &
+if [ "$APP_MODE" = "production" ]; then
+    # Preloaded gunicorn; a single worker unless WEB_CONCURRENCY is set (sessions are per worker)
+    echo "🏭 Production mode: gunicorn with ${WEB_CONCURRENCY:-1} worker(s)"
+    BIND="0.0.0.0:8000" gunicorn -c gunicorn.conf.py app.main:app >/dev/null 2>&1 &
+else
+    (cd app && python -m uvicorn main:app --reload --port 8000 --log-level error) >/dev/null 2>&1 &
+fi
 BACKEND_PID=$!
 
 # Wait for backend to be ready
@@ -0,0 +1,175 @@
+"""Typed loaders for the ML datasets, with a cached columnar copy.
+
+- car-sales.csv: Make/Colour as categories, Odometer (KM) and Doors as
+  compact nullable integers, Price parsed from strings like "$4,000.00"
+- heart-disease.csv: BOM-prefixed header, every column a small nullable int
+  except oldpeak
+
+Both CSVs are read in chunks with explicit dtypes, so a multi-GB file with
+the same columns never has to be held as strings. Integer columns are parsed
+as Int64 and then downcast to the schema's width only when every value fits
+(read_csv would silently wrap 300 to 44 in an Int8 column); a chunk with
+larger values keeps the next wider type instead. Blank cells become <NA>.
+
+The typed frame is cached as Parquet under .cache/, keyed by the SHA-256 of
+the source CSV, so later loads skip parsing.
+
+    from data_loaders import load_car_sales, load_heart_disease
+    heart_disease = load_heart_disease()
+"""
+import hashlib
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+DATA_DIR = Path(__file__).parent
+DEFAULT_CACHE_DIR = DATA_DIR / ".cache"
+
+# Part of the cache key: change it whenever the parsed output changes
+LOADERS_VERSION = 2
+
+CHUNKSIZE = 100_000
+
+CAR_SALES_DTYPES = {
+    "Make": "category",
+    "Colour": "category",
+    "Odometer (KM)": "UInt32",
+    "Doors": "UInt8",
+    # parsed from "$4,000.00" after reading
+    "Price": "string",
+}
+
+HEART_DISEASE_DTYPES = {
+    "age": "Int8",
+    "sex": "Int8",
+    "cp": "Int8",
+    "trestbps": "Int16",
+    "chol": "Int16",
+    "fbs": "Int8",
+    "restecg": "Int8",
+    "thalach": "Int16",
+    "exang": "Int8",
+    "oldpeak": "float32",
+    "slope": "Int8",
+    "ca": "Int8",
+    "thal": "Int8",
+    "target": "Int8",
+}
+
+_SIGNED = ["Int8", "Int16", "Int32", "Int64"]
+_UNSIGNED = ["UInt8", "UInt16", "UInt32", "UInt64"]
+
+
+def _is_integer(dtype: str) -> bool:
+    return dtype in _SIGNED or dtype in _UNSIGNED
+
+
+def fit_integer(values: pd.Series, dtype: str) -> pd.Series:
+    """Cast parsed Int64 values to dtype, or to the next wider type that holds all of them"""
+    if values.isna().all():
+        return values.astype(dtype)
+    low, high = values.min(), values.max()
+    width = np.dtype(dtype.lower()).itemsize
+    ladder = _UNSIGNED if dtype in _UNSIGNED and low >= 0 else _SIGNED
+    for candidate in ladder:
+        info = np.iinfo(candidate.lower())
+        if np.dtype(candidate.lower()).itemsize >= width and info.min <= low and high <= info.max:
+            if candidate != dtype:
+                warnings.warn(f"{values.name}: values {low}..{high} don't fit {dtype}, keeping {candidate}")
+            return values.astype(candidate)
+    return values
+
+
+def parse_currency(values: pd.Series) -> pd.Series:
+    """Parse strings like "$4,000.00" into floats for a whole column at once; blanks become NaN"""
+    cleaned = values.astype("string").str.replace(r"[$,\s]", "", regex=True)
+    return pd.to_numeric(cleaned.replace("", pd.NA), errors="coerce").astype("float64")
+
+
+def _concat_chunks(chunks) -> pd.DataFrame:
+    chunks = list(chunks)
+    if len(chunks) == 1:
+        return chunks[0]
+    # Chunks see different category sets; union them so the columns stay categorical
+    categorical = [c for c in chunks[0].columns if isinstance(chunks[0][c].dtype, pd.CategoricalDtype)]
+    for column in categorical:
+        categories = union_categoricals([chunk[column] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_typed_csv(path: Path, dtypes: Dict[str, str], chunksize: int = CHUNKSIZE,
+                   transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+    """Stream a CSV in chunks with explicit dtypes, applying transform to each chunk"""
+    integers = [column for column, dtype in dtypes.items() if _is_integer(dtype)]
+    chunks = pd.read_csv(
+        path,
+        # Parse integers wide; fit_integer narrows them with a range check
+        dtype={**dtypes, **{column: "Int64" for column in integers}},
+        usecols=list(dtypes),
+        # utf-8-sig drops a leading BOM, which would otherwise end up in the first column name
+        encoding="utf-8-sig",
+        chunksize=chunksize,
+    )
+
+    def typed(chunk: pd.DataFrame) -> pd.DataFrame:
+        for column in integers:
+            chunk[column] = fit_integer(chunk[column], dtypes[column])
+        return transform(chunk) if transform is not None else chunk
+
+    return _concat_chunks(typed(chunk) for chunk in chunks)
+
+
+def _parse_car_sales(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk["Price"] = parse_currency(chunk["Price"])
+    return chunk
+
+
+def cached_frame(name: str, path: Path, read: Callable[[Path], pd.DataFrame],
+                 cache_dir: Path = DEFAULT_CACHE_DIR, refresh: bool = False) -> pd.DataFrame:
+    """read(path), memoized as Parquet for as long as the file's contents don't change.
+
+    Without a Parquet engine (pyarrow/fastparquet) the frame is returned uncached.
+    """
+    path = Path(path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    cache_path = Path(cache_dir) / f"{name}-v{LOADERS_VERSION}-{digest.hexdigest()[:16]}.parquet"
+
+    if cache_path.exists() and not refresh:
+        return pd.read_parquet(cache_path)
+
+    frame = read(path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        frame.to_parquet(cache_path, index=False)
+    except ImportError:
+        pass
+    return frame
+
+
+def read_car_sales_csv(path: Path = DATA_DIR / "car-sales.csv", chunksize: int = CHUNKSIZE) -> pd.DataFrame:
+    return read_typed_csv(path, CAR_SALES_DTYPES, chunksize, transform=_parse_car_sales)
+
+
+def read_heart_disease_csv(path: Path = DATA_DIR / "heart-disease.csv", chunksize: int = CHUNKSIZE) -> pd.DataFrame:
+    return read_typed_csv(path, HEART_DISEASE_DTYPES, chunksize)
+
+
+def load_car_sales(path: Path = DATA_DIR / "car-sales.csv", cache_dir: Path = DEFAULT_CACHE_DIR,
+                   refresh: bool = False) -> pd.DataFrame:
+    """Typed car sales, from the cache when the source file hasn't changed"""
+    return cached_frame("car-sales", path, read_car_sales_csv, cache_dir, refresh)
+
+
+def load_heart_disease(path: Path = DATA_DIR / "heart-disease.csv", cache_dir: Path = DEFAULT_CACHE_DIR,
+                       refresh: bool = False) -> pd.DataFrame:
+    """Typed heart disease data, from the cache when the source file hasn't changed"""
+    return cached_frame("heart-disease", path, read_heart_disease_csv, cache_dir, refresh)